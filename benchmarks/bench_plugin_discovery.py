@@ -0,0 +1,70 @@
+# worker/benchmarks/bench_plugin_discovery.py
+"""
+Pipeline eklenti keşfinin başlangıç maliyetini ölçer.
+
+Her ölçüm temiz bir Python yorumlayıcısında yapılır ve üç mod karşılaştırılır:
+- eager:      tüm pipeline sınıfları başlangıçta import edilir (eski davranış)
+- lazy-cold:  manifest yok; katalog entry_point'lerden yeniden üretilir
+- lazy-warm:  geçerli manifest var; hiçbir eklenti import edilmez
+
+Kullanım:
+    python benchmarks/bench_plugin_discovery.py --repeats 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+_CHILD_CODE = """
+import json, resource, sys, time
+t0 = time.perf_counter()
+from azuraforge_worker.plugins import discover_pipelines, pipeline_registry
+catalog = discover_pipelines(eager=(sys.argv[1] == "eager"), manifest_path=sys.argv[2])
+elapsed = time.perf_counter() - t0
+print(json.dumps({
+    "seconds": elapsed,
+    "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    "pipelines": len(catalog),
+    "loaded_classes": sum(1 for name in catalog if pipeline_registry.is_loaded(name)),
+}))
+"""
+
+
+def _run_once(mode: str, manifest_path: str) -> dict:
+    if mode == "lazy-cold" and os.path.exists(manifest_path):
+        os.remove(manifest_path)
+    loading = "eager" if mode == "eager" else "lazy"
+    output = subprocess.run(
+        [sys.executable, "-c", _CHILD_CODE, loading, manifest_path],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    report = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        manifest_path = os.path.join(tmp_dir, "pipelines_manifest.json")
+        for mode in ("eager", "lazy-cold", "lazy-warm"):
+            if mode == "lazy-warm":
+                _run_once("lazy-cold", manifest_path)  # Manifesti ısıt
+            runs = [_run_once(mode, manifest_path) for _ in range(args.repeats)]
+            report[mode] = {
+                "median_seconds": statistics.median(r["seconds"] for r in runs),
+                "median_max_rss_kb": statistics.median(r["max_rss_kb"] for r in runs),
+                "pipelines": runs[-1]["pipelines"],
+                "loaded_classes": runs[-1]["loaded_classes"],
+            }
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
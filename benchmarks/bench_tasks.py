@@ -0,0 +1,188 @@
+# worker/benchmarks/bench_tasks.py
+"""
+Worker görevlerinin sıcak yollarını yerel yedeklerle ölçer.
+
+- Postgres yerine geçici bir SQLite veritabanı,
+- Redis yerine fakeredis (veya `--redis-url` ile yerel bir Redis),
+- Eklentiler yerine `synthetic_pipeline.SyntheticSeriesPipeline`
+
+kullanılır; görevler Celery'nin `apply()` metoduyla eager çalıştırılır. Böylece
+ölçüm, ağ erişimi ve GPU olmadan CPU'lu bir Linux makinede yapılabilir.
+
+Raporlanan değerler: içe aktarma/başlangıç süresi, eğitim görev/sn, tahmin
+gecikmesi p50/p99 (sonuç önbelleği kapalıyken gerçek tahmin, ayrıca önbellekten
+dönen yanıtlar), en yüksek RSS ve ilerleme yayın baytları. Sonuçlar,
+çalıştırmalar karşılaştırılabilsin diye `benchmarks/results/` altına JSON
+olarak yazılır.
+
+Kullanım:
+    pip install -e .[bench]
+    python benchmarks/bench_tasks.py --train-runs 3 --predict-runs 200
+"""
+import argparse
+import importlib
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return float("nan")
+    rank = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[rank]
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=BENCH_DIR, check=True,
+                              capture_output=True, text=True).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def _setup_environment(work_dir: str) -> None:
+    os.environ["REPORTS_DIR"] = os.path.join(work_dir, "reports")
+    os.environ["CACHE_DIR"] = os.path.join(work_dir, "cache")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(work_dir, 'bench.db')}"
+    os.environ.setdefault("AZURAFORGE_METRICS_ENABLED", "true")
+    # Tahmin gecikmesi sonuç önbelleği kapalıyken ölçülür; önbellekli yol ayrıca raporlanır.
+    os.environ["PREDICTION_CACHE_ENABLED"] = "false"
+
+
+def _setup_redis(redis_url: str) -> str:
+    from azuraforge_worker.redis_pool import init_redis_pool
+
+    if redis_url:
+        init_redis_pool(redis_url)
+        return redis_url
+    try:
+        import fakeredis
+    except ImportError:
+        sys.exit("fakeredis is not installed; install it with `pip install -e .[bench]` or pass --redis-url.")
+    init_redis_pool(connection_class=fakeredis.FakeConnection, server=fakeredis.FakeServer())
+    return "fakeredis"
+
+
+def _setup_database() -> None:
+    from azuraforge_dbmodels import Experiment
+    # `azuraforge_worker.celery_app` paket özniteliği Celery nesnesine bağlıdır; modülün kendisi gerekir.
+    celery_app_module = importlib.import_module("azuraforge_worker.celery_app")
+
+    celery_app_module.init_worker_db_connection()
+    Experiment.metadata.create_all(celery_app_module.engine)
+
+
+def run(args: argparse.Namespace) -> dict:
+    sys.path.insert(0, BENCH_DIR)
+    work_dir = tempfile.mkdtemp(prefix="azuraforge-bench-")
+    _setup_environment(work_dir)
+
+    import_start = time.perf_counter()
+    from azuraforge_worker.redis_pool import get_redis_pool_stats
+    redis_backend = _setup_redis(args.redis_url)
+    from azuraforge_worker.tasks import training_tasks
+    import_seconds = time.perf_counter() - import_start
+
+    from azuraforge_worker.metrics import metrics_registry
+    from synthetic_pipeline import SYNTHETIC_PIPELINE_NAME, SyntheticSeriesPipeline, make_synthetic_config
+
+    _setup_database()
+    training_tasks.AVAILABLE_PIPELINES.register(SYNTHETIC_PIPELINE_NAME, SyntheticSeriesPipeline)
+    config = make_synthetic_config(rows=args.rows, epochs=args.epochs)
+
+    train_start = time.perf_counter()
+    experiment_id = None
+    for _ in range(args.train_runs):
+        result = training_tasks.start_training_pipeline.apply(args=[config])
+        experiment_id = result.get()["experiment_id"]
+    train_seconds = time.perf_counter() - train_start
+
+    def _measure_predictions(runs: int) -> list:
+        latencies = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            training_tasks.predict_from_model_task.apply(
+                args=[experiment_id], kwargs={"prediction_steps": args.prediction_steps}
+            ).get()
+            latencies.append(time.perf_counter() - start)
+        return latencies
+
+    latencies = _measure_predictions(args.predict_runs)
+    training_tasks.prediction_result_cache.enabled = True
+    cached_latencies = _measure_predictions(args.cached_predict_runs)
+
+    snapshot = metrics_registry.snapshot()
+    train_counters = snapshot["counters"].get("start_training_pipeline", {})
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "redis": redis_backend,
+            "args": vars(args),
+        },
+        "startup": {"import_seconds": import_seconds},
+        "training": {
+            "runs": args.train_runs,
+            "total_seconds": train_seconds,
+            "tasks_per_second": args.train_runs / train_seconds if train_seconds > 0 else None,
+            "progress_publish_bytes": train_counters.get("progress_bytes", 0),
+            "epochs": train_counters.get("epochs", 0),
+        },
+        "prediction": {
+            "runs": args.predict_runs,
+            "first_call_seconds": latencies[0] if latencies else None,
+            "p50_seconds": _percentile(latencies, 50),
+            "p99_seconds": _percentile(latencies, 99),
+            "mean_seconds": statistics.fmean(latencies) if latencies else None,
+        },
+        "prediction_cached": {
+            "runs": args.cached_predict_runs,
+            "p50_seconds": _percentile(cached_latencies, 50),
+            "p99_seconds": _percentile(cached_latencies, 99),
+            "mean_seconds": statistics.fmean(cached_latencies) if cached_latencies else None,
+            "result_cache": training_tasks.prediction_result_cache.stats(),
+        },
+        "memory": {"peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss},
+        "phases": snapshot["phase_seconds_sum"],
+        "redis_pool": get_redis_pool_stats(),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--train-runs", type=int, default=3)
+    parser.add_argument("--predict-runs", type=int, default=100)
+    parser.add_argument("--cached-predict-runs", type=int, default=100,
+                        help="Predictions served from the result cache, reported separately.")
+    parser.add_argument("--prediction-steps", type=int, default=24)
+    parser.add_argument("--epochs", type=int, default=5)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--redis-url", default="", help="Use a real Redis instead of fakeredis.")
+    parser.add_argument("--output-dir", default=os.path.join(BENCH_DIR, "results"))
+    args = parser.parse_args()
+
+    report = run(args)
+    os.makedirs(args.output_dir, exist_ok=True)
+    output_path = os.path.join(args.output_dir, f"bench_tasks_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(output_path, "w") as f:
+        json.dump(report, f, indent=2, default=str)
+    print(json.dumps(report, indent=2, default=str))
+    print(f"Results written to {output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# worker/benchmarks/bench_thread_budget.py
+"""
+Eşzamanlı çocuk süreçlerin BLAS thread bütçesinin verime etkisini ölçer.
+
+`--processes` kadar süreç aynı anda NumPy matris çarpımı yapar; her senaryoda
+OMP/MKL/OpenBLAS thread sayısı farklı ayarlanır. "oversubscribed" senaryosu,
+her sürecin tüm çekirdekleri kullandığı (sınırlamasız) durumu temsil eder;
+"budget" senaryosu `thread_budget.compute_thread_budget` değerini kullanır.
+
+Kullanım:
+    python benchmarks/bench_thread_budget.py --processes 4 --size 512 --iterations 20
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS", "NUMEXPR_NUM_THREADS")
+
+_CHILD_SCRIPT = """
+import sys, time
+import numpy as np
+size, iterations = int(sys.argv[1]), int(sys.argv[2])
+rng = np.random.default_rng(0)
+a = rng.standard_normal((size, size), dtype=np.float32)
+b = rng.standard_normal((size, size), dtype=np.float32)
+a @ b
+start = time.perf_counter()
+for _ in range(iterations):
+    a @ b
+print(time.perf_counter() - start)
+"""
+
+
+def _run_scenario(processes: int, threads: int, size: int, iterations: int) -> dict:
+    env = {**os.environ, **{name: str(threads) for name in THREAD_ENV_VARS}}
+    start = time.perf_counter()
+    children = [
+        subprocess.Popen([sys.executable, "-c", _CHILD_SCRIPT, str(size), str(iterations)],
+                         env=env, stdout=subprocess.PIPE, text=True)
+        for _ in range(processes)
+    ]
+    child_seconds = [float(child.communicate()[0].strip()) for child in children]
+    wall_seconds = time.perf_counter() - start
+    total_matmuls = processes * iterations
+    return {
+        "threads_per_process": threads,
+        "wall_seconds": wall_seconds,
+        "max_child_seconds": max(child_seconds),
+        "matmuls_per_second": total_matmuls / max(child_seconds),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--processes", type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    parser.add_argument("--size", type=int, default=512)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--output-dir", default=os.path.join(BENCH_DIR, "results"))
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.join(os.path.dirname(BENCH_DIR), "src"))
+    from azuraforge_worker.thread_budget import available_cpus, compute_thread_budget
+
+    cpu_count = len(available_cpus())
+    scenarios = {
+        "single_thread": 1,
+        "budget": compute_thread_budget(args.processes, cpu_count),
+        "oversubscribed": cpu_count,
+    }
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": cpu_count,
+            "args": vars(args),
+        },
+        "scenarios": {
+            name: _run_scenario(args.processes, threads, args.size, args.iterations)
+            for name, threads in scenarios.items()
+        },
+    }
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    output_path = os.path.join(args.output_dir, f"bench_thread_budget_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(output_path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
+    print(f"Results written to {output_path}")
+
+
+if __name__ == "__main__":
+    main()
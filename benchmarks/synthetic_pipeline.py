@@ -0,0 +1,47 @@
+# worker/benchmarks/synthetic_pipeline.py
+"""
+Benchmark'lar için ağ erişimi gerektirmeyen, deterministik bir zaman serisi
+pipeline'ı. Veri kaynağı yerine sabit tohumlu sentetik bir sinüs + gürültü
+serisi üretir.
+"""
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from azuraforge_learner import TimeSeriesPipeline, Sequential, LSTM, Linear
+
+SYNTHETIC_PIPELINE_NAME = "bench_synthetic"
+
+
+class SyntheticSeriesPipeline(TimeSeriesPipeline):
+    def _load_data_from_source(self) -> pd.DataFrame:
+        params = self.config.get("data_sourcing", {})
+        rows = int(params.get("rows", 5000))
+        rng = np.random.default_rng(int(params.get("seed", 42)))
+        t = np.arange(rows, dtype=np.float64)
+        values = 100 + 10 * np.sin(t / 24.0) + rng.normal(0, 1, rows).cumsum() * 0.1
+        index = pd.date_range("2020-01-01", periods=rows, freq="h", name="time")
+        return pd.DataFrame({"value": values.astype(np.float32)}, index=index)
+
+    def get_caching_params(self) -> Dict[str, Any]:
+        params = self.config.get("data_sourcing", {})
+        return {"rows": params.get("rows", 5000), "seed": params.get("seed", 42)}
+
+    def _get_target_and_feature_cols(self) -> Tuple[str, List[str]]:
+        return "value", ["value"]
+
+    def _create_model(self, input_shape: Tuple) -> Sequential:
+        hidden_size = self.config.get("model_params", {}).get("hidden_size", 16)
+        return Sequential(LSTM(input_size=input_shape[-1], hidden_size=hidden_size), Linear(hidden_size, 1))
+
+
+def make_synthetic_config(rows: int, epochs: int, sequence_length: int = 24) -> Dict[str, Any]:
+    return {
+        "pipeline_name": SYNTHETIC_PIPELINE_NAME,
+        "data_sourcing": {"rows": rows, "seed": 42},
+        "model_params": {"sequence_length": sequence_length, "hidden_size": 16},
+        "training_params": {"epochs": epochs, "lr": 0.01, "optimizer": "adam"},
+        # Görevlerin sıcak yolları (süreç içi veri önbelleği, paylaşımlı depo) ölçülsün diye açık.
+        "system": {"caching_enabled": True},
+    }
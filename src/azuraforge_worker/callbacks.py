@@ -2,27 +2,140 @@
 
 import json
 import os
+import time
 import redis
-from typing import Any, Optional
+import numpy as np
+from typing import Any, Dict, List, Optional
 from azuraforge_learner import Callback
 import logging # Loglama modülünü import ediyoruz
 
+from .redis_pool import get_redis
+from .checkpoints import save_checkpoint, restore_checkpoint
+from .cancellation import (CANCEL_REASON_EARLY_STOPPED, TrainingCancelled, get_cancellation_reason,
+                           report_and_check_median)
+
+try:
+    import msgpack
+except ImportError:  # msgpack opsiyoneldir; yoksa JSON kullanılır.
+    msgpack = None
+
+VALIDATION_MODE_FULL = "full"
+VALIDATION_MODE_DELTA = "delta"
+ENCODING_JSON = "json"
+ENCODING_MSGPACK = "msgpack"
+TRANSPORT_PUBSUB = "pubsub"
+TRANSPORT_STREAM = "stream"
+TRANSPORT_BOTH = "both"
+
+
+def progress_stream_key(task_id: str) -> str:
+    """Bir görevin ilerleme mesajlarını tutan Redis Stream anahtarı."""
+    return f"task-progress-stream:{task_id}"
+
+
+def lttb_indices(y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets algoritmasıyla, serinin görsel şeklini koruyan
+    `threshold` adet noktanın indekslerini döndürür.
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.arange(n, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    indices = np.empty(threshold, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+    bucket_size = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        start = int(np.floor(i * bucket_size)) + 1
+        end = int(np.floor((i + 1) * bucket_size)) + 1
+        next_start, next_end = end, min(int(np.floor((i + 2) * bucket_size)) + 1, n)
+        avg_x = x[next_start:next_end].mean() if next_end > next_start else x[n - 1]
+        avg_y = y[next_start:next_end].mean() if next_end > next_start else y[n - 1]
+        areas = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(areas))
+        indices[i + 1] = a
+    return indices
+
+
 class RedisProgressCallback(Callback):
     """
     Learner'dan gelen olayları dinler ve Redis Pub/Sub kanalı üzerinden
     ilerleme durumunu yayınlar.
+
+    Varsayılan ayarlar eski davranışı korur (her epoch'ta tam JSON). Yoğun
+    eğitimlerde yayın trafiğini azaltmak için:
+    - `min_interval_seconds` / `every_n_epochs`: yayınları seyreltir; aradaki
+      epoch'lar birleştirilir ve yalnızca en sonuncusu gönderilir.
+    - `validation_mode='delta'`: `y_true`/`x_axis` yalnızca ilk mesajda, sonraki
+      mesajlarda sadece `y_pred` gönderilir.
+    - `max_points`: doğrulama serileri LTTB ile bu sayıda noktaya indirgenir.
+    - `encoding='msgpack'`: sayısal seriler float32 bayt dizisi olarak paketlenir.
+    Son epoch her zaman tam ve indirgenmemiş olarak gönderilir.
+
+    `transport='stream'` (veya 'both') ile mesajlar ayrıca `task-progress-stream:{task_id}`
+    Redis Stream'ine `MAXLEN ~` sınırıyla yazılır; geç abone olan veya yeniden bağlanan
+    tüketiciler son gördükleri ID'den devam edebilir. Stream, eğitim bittikten sonra
+    `stream_ttl_seconds` içinde silinir.
     """
-    def __init__(self, task_id: str):
+    def __init__(self, task_id: str,
+                 min_interval_seconds: Optional[float] = None,
+                 every_n_epochs: Optional[int] = None,
+                 validation_mode: Optional[str] = None,
+                 max_points: Optional[int] = None,
+                 encoding: Optional[str] = None,
+                 transport: Optional[str] = None,
+                 stream_maxlen: Optional[int] = None,
+                 stream_ttl_seconds: Optional[int] = None,
+                 epoch_offset: int = 0):
         super().__init__()
         self.task_id = task_id
+        # Checkpoint'ten devam eden eğitimlerde epoch numaraları toplam eğitime göre yayınlanır.
+        self.epoch_offset = epoch_offset
+        self.min_interval_seconds = float(min_interval_seconds if min_interval_seconds is not None
+                                          else os.environ.get("PROGRESS_MIN_INTERVAL_SECONDS", 0))
+        self.every_n_epochs = max(1, int(every_n_epochs if every_n_epochs is not None
+                                         else os.environ.get("PROGRESS_EVERY_N_EPOCHS", 1)))
+        self.validation_mode = (validation_mode or os.environ.get("PROGRESS_VALIDATION_MODE", VALIDATION_MODE_FULL)).lower()
+        self.max_points = int(max_points if max_points is not None else os.environ.get("PROGRESS_MAX_POINTS", 0))
+        self.encoding = (encoding or os.environ.get("PROGRESS_ENCODING", ENCODING_JSON)).lower()
+        if self.encoding == ENCODING_MSGPACK and msgpack is None:
+            logging.warning("RedisProgressCallback: msgpack is not installed; falling back to JSON encoding.")
+            self.encoding = ENCODING_JSON
+
+        self.transport = (transport or os.environ.get("PROGRESS_TRANSPORT", TRANSPORT_PUBSUB)).lower()
+        self.stream_maxlen = int(stream_maxlen if stream_maxlen is not None
+                                 else os.environ.get("PROGRESS_STREAM_MAXLEN", 1000))
+        self.stream_ttl_seconds = int(stream_ttl_seconds if stream_ttl_seconds is not None
+                                      else os.environ.get("PROGRESS_STREAM_TTL_SECONDS", 3600))
+        # Worker eğitim ortasında ölürse stream'in sonsuza kadar kalmaması için güvenlik süresi.
+        self.stream_active_ttl_seconds = int(os.environ.get("PROGRESS_STREAM_ACTIVE_TTL_SECONDS", 7 * 24 * 3600))
+        self._closed = False
+
+        self._pending_payload: Optional[Dict[str, Any]] = None
+        self._last_publish_time: Optional[float] = None
+        self._epochs_since_publish = 0
+        self._static_sent = False
+        self._sample_indices: Optional[np.ndarray] = None
+        self.epochs_seen = 0
+        self.published_messages = 0
+        self.published_bytes = 0
+
         self._redis_client: Optional[redis.Redis] = None
         try:
-            redis_url = os.environ.get("REDIS_URL", "redis://redis:6379/0")
-            self._redis_client = redis.from_url(redis_url)
-            logging.info(f"RedisProgressCallback initialized for task {task_id}. Connected to Redis.")
+            # Her görev için yeni bağlantı açmak yerine süreç genelindeki havuz kullanılır.
+            self._redis_client = get_redis()
+            logging.info(f"RedisProgressCallback initialized for task {task_id}. Using shared Redis pool.")
         except Exception as e:
             logging.error(f"HATA: RedisProgressCallback içinde Redis'e bağlanılamadı: {e}")
 
+    @property
+    def _is_legacy(self) -> bool:
+        return (self.validation_mode == VALIDATION_MODE_FULL and self.max_points <= 0
+                and self.encoding == ENCODING_JSON)
+
     def on_epoch_end(self, event: Any) -> None:
         """
         Her epoch sonunda Learner tarafından tetiklenir ve
@@ -30,15 +143,61 @@ class RedisProgressCallback(Callback):
         """
         if not self._redis_client or not self.task_id:
             return
-            
+
         payload = event.payload
         if not payload:
             logging.warning(f"RedisProgressCallback: Empty payload for task {self.task_id}.")
             return
+        if self.epoch_offset and payload.get('epoch') is not None:
+            payload = {**payload, 'epoch': payload['epoch'] + self.epoch_offset}
+            if payload.get('total_epochs') is not None:
+                payload['total_epochs'] += self.epoch_offset
 
+        self._pending_payload = payload
+        self._epochs_since_publish += 1
+        self.epochs_seen += 1
+
+        if self._is_last_epoch(payload):
+            self.flush()
+        elif self._should_publish():
+            self._publish(self._pending_payload, final=False)
+
+    def on_train_end(self, event: Any = None) -> None:
+        """Eğitim bittiğinde, seyreltme nedeniyle bekleyen son epoch'u tam olarak gönderir."""
+        self.close()
+
+    def flush(self) -> None:
+        if self._pending_payload is not None and self._redis_client:
+            self._publish(self._pending_payload, final=True)
+
+    def close(self) -> None:
+        """Bekleyen son epoch'u gönderir ve stream'i tamamlanma süresiyle sona erdirir."""
+        if self._closed:
+            return
+        self.flush()
+        self._closed = True
+        if self._redis_client and self.transport in (TRANSPORT_STREAM, TRANSPORT_BOTH):
+            try:
+                self._redis_client.expire(progress_stream_key(self.task_id), self.stream_ttl_seconds)
+            except Exception as e:
+                logging.error(f"HATA: İlerleme stream'inin süresi ayarlanamadı: {e}")
+
+    @staticmethod
+    def _is_last_epoch(payload: Dict[str, Any]) -> bool:
+        epoch, total_epochs = payload.get('epoch'), payload.get('total_epochs')
+        return epoch is not None and total_epochs is not None and epoch >= total_epochs
+
+    def _should_publish(self) -> bool:
+        if self._epochs_since_publish < self.every_n_epochs:
+            return False
+        if self.min_interval_seconds > 0 and self._last_publish_time is not None:
+            return (time.monotonic() - self._last_publish_time) >= self.min_interval_seconds
+        return True
+
+    def _publish(self, payload: Dict[str, Any], final: bool) -> None:
         try:
             channel = f"task-progress:{self.task_id}"
-            
+
             # --- YENİ LOGLAMA İLE TEŞHİS ---
             validation_data = payload.get('validation_data')
             if validation_data:
@@ -50,8 +209,201 @@ class RedisProgressCallback(Callback):
                 logging.info(f"RedisProgressCallback: Publishing progress for task {self.task_id}, epoch {payload.get('epoch')}. Loss: {payload.get('loss'):.4f}. No validation data in payload.")
             # --- TEŞHİS SONU ---
 
-            message = json.dumps(payload)
+            message = self._encode(payload if self._is_legacy else self._compact(payload, final))
+            self._send(channel, message, final)
+            self.published_messages += 1
+            self.published_bytes += len(message)
+
+        except Exception as e:
+            logging.error(f"HATA: Redis'e ilerleme durumu yayınlanamadı: {e}", exc_info=True)
+        finally:
+            self._pending_payload = None
+            self._epochs_since_publish = 0
+            self._last_publish_time = time.monotonic()
+
+    def _send(self, channel: str, message: bytes, final: bool) -> None:
+        if self.transport == TRANSPORT_PUBSUB:
             self._redis_client.publish(channel, message)
-            
+            return
+
+        # Tüm komutlar tek bir pipeline ile gönderilir: epoch başına tek round-trip.
+        stream_key = progress_stream_key(self.task_id)
+        pipe = self._redis_client.pipeline(transaction=False)
+        if self.transport == TRANSPORT_BOTH:
+            pipe.publish(channel, message)
+        pipe.xadd(stream_key, {"data": message, "final": "1" if final else "0"},
+                  maxlen=self.stream_maxlen, approximate=True)
+        pipe.expire(stream_key, self.stream_active_ttl_seconds)
+        pipe.execute()
+
+    def _compact(self, payload: Dict[str, Any], final: bool) -> Dict[str, Any]:
+        """Doğrulama verisini seçilen moda göre indirger; son mesaj her zaman tamdır."""
+        validation_data = payload.get('validation_data')
+        if not validation_data or final:
+            return payload if not validation_data else {**payload, 'validation_data_mode': VALIDATION_MODE_FULL}
+
+        y_true = validation_data.get('y_true')
+        y_true = [] if y_true is None else y_true
+        if self.max_points > 0 and self._sample_indices is None and len(y_true) > self.max_points:
+            # İndeksler y_true üzerinden bir kez seçilir; böylece delta mesajlardaki
+            # y_pred noktaları ilk mesajdaki x_axis ile hizalı kalır.
+            self._sample_indices = lttb_indices(np.asarray(y_true, dtype=np.float64), self.max_points)
+
+        def _sample(values: List[Any]) -> List[Any]:
+            if self._sample_indices is None or len(values) != len(y_true):
+                return values
+            return [values[i] for i in self._sample_indices]
+
+        compact: Dict[str, Any] = {'y_pred': _sample(validation_data.get('y_pred', []))}
+        send_static = self.validation_mode != VALIDATION_MODE_DELTA or not self._static_sent
+        if send_static:
+            compact['y_true'] = _sample(y_true)
+            compact['x_axis'] = _sample(validation_data.get('x_axis', []))
+            self._static_sent = True
+
+        return {
+            **payload,
+            'validation_data': compact,
+            'validation_data_mode': VALIDATION_MODE_FULL if send_static else VALIDATION_MODE_DELTA,
+            'downsampled': self._sample_indices is not None,
+        }
+
+    def _encode(self, payload: Dict[str, Any]) -> bytes:
+        if self.encoding != ENCODING_MSGPACK:
+            return json.dumps(payload).encode("utf-8")
+
+        validation_data = payload.get('validation_data')
+        if validation_data:
+            packed_fields, packed = [], dict(validation_data)
+            for field, values in validation_data.items():
+                try:
+                    packed[field] = np.asarray(values, dtype=np.float32).tobytes()
+                    packed_fields.append(field)
+                except (TypeError, ValueError):
+                    pass  # Tarih dizeleri gibi sayısal olmayan alanlar olduğu gibi kalır.
+            payload = {**payload, 'validation_data': packed, 'packed_float32_fields': packed_fields}
+        return msgpack.packb(payload, use_bin_type=True, default=str)
+
+
+class CheckpointCallback(Callback):
+    """
+    Eğitim sırasında learner ve optimizer durumunu `experiment_dir/checkpoints/`
+    altına periyodik olarak kaydeder (bkz. checkpoints.py). Görev yeniden teslim
+    edildiğinde `resume_from` ile verilen checkpoint eğitim başında geri yüklenir;
+    böylece worker kaybında en fazla bir aralıklık iş kaybedilir.
+
+    - `every_n_epochs`: en az bu kadar epoch'ta bir kayıt
+    - `min_interval_seconds`: iki kayıt arasında en az bu kadar süre
+    """
+    def __init__(self, experiment_dir: str, pipeline_instance: Any,
+                 every_n_epochs: Optional[int] = None,
+                 min_interval_seconds: Optional[float] = None,
+                 resume_from: Optional[Dict[str, Any]] = None):
+        super().__init__()
+        self.experiment_dir = experiment_dir
+        self.pipeline_instance = pipeline_instance
+        self.every_n_epochs = max(1, int(every_n_epochs if every_n_epochs is not None
+                                         else os.environ.get("CHECKPOINT_EVERY_N_EPOCHS", 1)))
+        self.min_interval_seconds = float(min_interval_seconds if min_interval_seconds is not None
+                                          else os.environ.get("CHECKPOINT_INTERVAL_SECONDS", 300))
+        self.resume_from = resume_from
+        self.epoch_offset = int(resume_from["epoch"]) if resume_from else 0
+        self.saved_checkpoints = 0
+        self._epochs_since_save = 0
+        self._last_save_time = time.monotonic()
+
+    def _learner(self) -> Any:
+        return getattr(self, "learner", None) or getattr(self.pipeline_instance, "learner", None)
+
+    def on_train_begin(self, event: Any = None) -> None:
+        if not self.resume_from:
+            return
+        learner = self._learner()
+        if learner is None:
+            logging.warning("CheckpointCallback: learner is not available; training restarts from scratch.")
+            return
+        restore_checkpoint(learner, self.resume_from)
+
+    def on_epoch_end(self, event: Any) -> None:
+        payload = getattr(event, "payload", None) or {}
+        self._epochs_since_save += 1
+        # Son epoch her zaman kaydedilir; kayıttan sonra görev kaybolursa yeniden eğitim yapılmaz.
+        is_last_epoch = RedisProgressCallback._is_last_epoch(payload)
+        if self._epochs_since_save < self.every_n_epochs and not is_last_epoch:
+            return
+        if (time.monotonic() - self._last_save_time) < self.min_interval_seconds and not is_last_epoch:
+            return
+        learner = self._learner()
+        if learner is None or payload.get("epoch") is None:
+            return
+
+        epoch = self.epoch_offset + int(payload["epoch"])
+        total_epochs = payload.get("total_epochs")
+        try:
+            save_checkpoint(learner, self.experiment_dir, epoch,
+                            self.epoch_offset + int(total_epochs) if total_epochs is not None else None,
+                            progress={**payload, "epoch": epoch}, final=is_last_epoch)
+            self.saved_checkpoints += 1
+            logging.info(f"CheckpointCallback: Saved checkpoint for epoch {epoch} in {self.experiment_dir}.")
         except Exception as e:
-            logging.error(f"HATA: Redis'e ilerleme durumu yayınlanamadı: {e}", exc_info=True)
\ No newline at end of file
+            # Checkpoint yazılamaması eğitimi durdurmamalı.
+            logging.error(f"HATA: Checkpoint kaydedilemedi: {e}")
+        self._epochs_since_save = 0
+        self._last_save_time = time.monotonic()
+
+
+class CancellationCallback(Callback):
+    """
+    Epoch sonlarında iptal isteklerini yoklar ve gerekiyorsa `TrainingCancelled`
+    fırlatarak eğitimi bir sonraki epoch sınırında durdurur (bkz. cancellation.py).
+
+    - `target_ids`: iptal anahtarları yoklanacak görev/tarama/deney ID'leri
+    - `poll_interval_seconds`: iki Redis yoklaması arasındaki en kısa süre
+    - `sweep_id` + `early_stopping`: taramalarda medyan kuralıyla erken durdurma
+    """
+    def __init__(self, target_ids: List[str],
+                 poll_interval_seconds: Optional[float] = None,
+                 sweep_id: Optional[str] = None,
+                 member_id: Optional[str] = None,
+                 early_stopping: Optional[Dict[str, Any]] = None,
+                 epoch_offset: int = 0):
+        super().__init__()
+        self.target_ids = [target_id for target_id in target_ids if target_id]
+        self.poll_interval_seconds = float(poll_interval_seconds if poll_interval_seconds is not None
+                                           else os.environ.get("CANCELLATION_POLL_INTERVAL_SECONDS", 1))
+        self.sweep_id = sweep_id
+        self.member_id = member_id
+        self.early_stopping = early_stopping if sweep_id and member_id else None
+        self.epoch_offset = epoch_offset
+        self.last_payload: Optional[Dict[str, Any]] = None
+        self.best_loss: Optional[float] = None
+        self._last_poll_time: Optional[float] = None
+
+    def on_epoch_end(self, event: Any) -> None:
+        payload = getattr(event, "payload", None) or {}
+        self.last_payload = payload
+        epoch = self.epoch_offset + int(payload.get("epoch") or 0)
+        loss = payload.get("loss")
+        if loss is not None and (self.best_loss is None or loss < self.best_loss):
+            self.best_loss = float(loss)
+
+        # Erken durdurmada her epoch raporlanmalı; aksi halde medyan karşılaştırması eksik kalır.
+        now = time.monotonic()
+        if (not self.early_stopping and self._last_poll_time is not None
+                and (now - self._last_poll_time) < self.poll_interval_seconds):
+            return
+        self._last_poll_time = now
+
+        try:
+            reason = get_cancellation_reason(self.target_ids)
+            detail = ""
+            if reason is None and self.early_stopping and self.best_loss is not None:
+                detail = report_and_check_median(self.sweep_id, self.member_id, epoch, self.best_loss,
+                                                 **self.early_stopping)
+                reason = CANCEL_REASON_EARLY_STOPPED if detail else None
+        except redis.RedisError as e:
+            # Redis erişilemiyorsa eğitim durdurulmaz; bir sonraki epoch'ta tekrar denenir.
+            logging.error(f"HATA: İptal isteği kontrol edilemedi: {e}")
+            return
+        if reason:
+            raise TrainingCancelled(reason, epoch=epoch, detail=detail or "")
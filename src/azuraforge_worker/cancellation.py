@@ -0,0 +1,100 @@
+# worker/src/azuraforge_worker/cancellation.py
+"""
+Bu modül, çalışan eğitimlerin çocuk süreci öldürmeden, bir sonraki epoch
+sınırında durdurulmasını sağlar.
+
+İptal isteği bir Redis anahtarıdır (`training-cancel:{hedef}`); hedef bir görev
+ID'si, bir tarama (batch) görev ID'si veya bir deney ID'si olabilir. Eğitim
+tarafında `CancellationCallback` bu anahtarları epoch sonlarında yoklar ve
+`TrainingCancelled` fırlatır; görev kısmi sonuçları kaydeder, deneyi
+`CANCELLED` olarak işaretler ve normal şekilde döner.
+
+Aynı mekanizma taramalarda sunucu tarafı erken durdurma için de kullanılır:
+konfigürasyondaki `system.early_stopping` ile, aynı epoch'ta diğer
+konfigürasyonların en iyi kayıplarının medyanından kötü olanlar durdurulur
+(median stopping rule).
+"""
+import logging
+import os
+import statistics
+from typing import Any, Dict, Iterable, List, Optional
+
+from .redis_pool import get_redis
+
+CANCEL_REASON_USER = "user"
+CANCEL_REASON_EARLY_STOPPED = "early_stopped"
+
+
+class TrainingCancelled(Exception):
+    """Eğitim, iptal isteği veya erken durdurma kuralı nedeniyle epoch sınırında durduruldu."""
+    error_code = "CANCELLED"
+
+    def __init__(self, reason: str, epoch: Optional[int] = None, detail: str = ""):
+        self.reason = reason
+        self.epoch = epoch
+        super().__init__(f"Training cancelled at epoch {epoch} ({reason}){': ' + detail if detail else ''}")
+
+
+def cancel_key(target_id: str) -> str:
+    return f"training-cancel:{target_id}"
+
+
+def sweep_losses_key(sweep_id: str, epoch: int) -> str:
+    return f"training-sweep-losses:{sweep_id}:{epoch}"
+
+
+def request_cancellation(target_id: str, reason: str = CANCEL_REASON_USER) -> None:
+    """Görev, tarama veya deney ID'si için iptal isteği bırakır (API tarafından çağrılır)."""
+    ttl_seconds = int(os.getenv("CANCELLATION_TTL_SECONDS", 24 * 3600))
+    get_redis().set(cancel_key(target_id), reason, ex=ttl_seconds)
+    logging.info(f"Cancellation requested for {target_id} ({reason}).")
+
+
+def get_cancellation_reason(target_ids: Iterable[str]) -> Optional[str]:
+    """Verilen hedeflerden herhangi biri için iptal isteği varsa nedenini döndürür."""
+    keys = [cancel_key(target_id) for target_id in target_ids if target_id]
+    if not keys:
+        return None
+    for value in get_redis().mget(keys):
+        if value is not None:
+            return value.decode("utf-8") if isinstance(value, bytes) else str(value)
+    return None
+
+
+def parse_early_stopping(config: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """`system.early_stopping` ayarını okur; yalnızca 'median' kuralı desteklenir."""
+    rule = (config.get("system", {}) or {}).get("early_stopping")
+    if not rule:
+        return None
+    if rule is True:
+        rule = {}
+    if rule.get("rule", "median") != "median":
+        logging.warning(f"Unsupported early stopping rule '{rule.get('rule')}'; early stopping disabled.")
+        return None
+    return {"min_epochs": int(rule.get("min_epochs", 5)), "min_peers": int(rule.get("min_peers", 3))}
+
+
+def report_and_check_median(sweep_id: str, member_id: str, epoch: int, best_loss: float,
+                            min_epochs: int, min_peers: int) -> Optional[str]:
+    """
+    Üyenin bu epoch'taki en iyi kaybını kaydeder ve diğer üyelerin aynı epoch'taki
+    en iyi kayıplarının medyanından kötüyse durdurma gerekçesini döndürür.
+    """
+    key = sweep_losses_key(sweep_id, epoch)
+    pipe = get_redis().pipeline()
+    pipe.hset(key, member_id, best_loss)
+    pipe.expire(key, int(os.getenv("CANCELLATION_TTL_SECONDS", 24 * 3600)))
+    pipe.hgetall(key)
+    peer_losses = pipe.execute()[-1]
+    if epoch < min_epochs:
+        return None
+
+    member_field = member_id.encode("utf-8")
+    peers: List[float] = [float(value) for field, value in peer_losses.items()
+                          if field not in (member_id, member_field)]
+    if len(peers) < min_peers:
+        return None
+    median = statistics.median(peers)
+    if best_loss > median:
+        return f"best loss {best_loss:.6g} is worse than the median {median:.6g} of {len(peers)} peers"
+    return None
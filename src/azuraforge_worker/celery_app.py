@@ -4,8 +4,9 @@ Bu modül, Celery uygulamasını ve worker süreçleri için sinyal (signal)
 yöneticilerini yapılandırır.
 """
 import os
+from typing import Any
 from celery import Celery
-from celery.signals import worker_process_init, worker_process_shutdown
+from celery.signals import task_postrun, worker_init, worker_process_init, worker_process_shutdown
 
 engine = None
 
@@ -18,6 +19,39 @@ celery_app = Celery(
     include=["azuraforge_worker.tasks.training_tasks"]
 )
 
+# Kısa süreli tahmin görevlerinin saatler süren eğitimlerin arkasında beklememesi için
+# görevler ayrı kuyruklara yönlendirilir. Hangi worker'ın hangi kuyruğu dinleyeceği
+# `start-worker --mode` ile seçilir (bkz. main.py).
+DEFAULT_QUEUE = "celery"
+TRAIN_QUEUE = "train"
+PREDICT_QUEUE = "predict"
+
+# acks_late kullanan eğitim görevleri, Redis broker'ın görünürlük süresi dolduğunda hâlâ
+# çalışırken başka bir worker'a yeniden teslim edilmemeli; bu süre en uzun eğitimden uzun olmalı.
+celery_app.conf.broker_transport_options = {
+    "visibility_timeout": int(os.getenv("BROKER_VISIBILITY_TIMEOUT_SECONDS", 24 * 3600)),
+}
+
+# Sert bellek sınırı (KiB): yalnızca prefork havuzunda geçerlidir. Celery, çocuk sürecin en
+# yüksek RSS'i (ru_maxrss) bu değeri aştığında süreci mevcut görev bittikten sonra yenisiyle
+# değiştirir; ru_maxrss eşlenmiş veri seti sayfalarını da sayar. Yumuşak sınır için bkz.
+# memory_governor.py.
+if hard_limit_mb := int(os.getenv("MEMORY_HARD_LIMIT_MB", 0)):
+    celery_app.conf.worker_max_memory_per_child = hard_limit_mb * 1024
+
+celery_app.conf.task_default_queue = DEFAULT_QUEUE
+# Yönlendirme yalnızca bu Celery uygulaması üzerinden gönderilen görevlere uygulanır. Görevleri
+# kendi Celery uygulamasıyla isimden gönderen üreticiler (ör. API) kuyruğu kendileri seçmelidir:
+# `send_task(..., queue=...)` veya `app.conf.task_routes = TASK_ROUTES`. Aksi halde görevler
+# varsayılan kuyruğa düşer ve yalnızca `train`/`all` modundaki worker'lar tarafından alınır.
+TASK_ROUTES = {
+    "start_training_pipeline": {"queue": TRAIN_QUEUE},
+    "start_training_batch": {"queue": TRAIN_QUEUE},
+    "predict_from_model_task": {"queue": PREDICT_QUEUE},
+    "predict_batch_task": {"queue": PREDICT_QUEUE},
+}
+celery_app.conf.task_routes = TASK_ROUTES
+
 def _get_database_url_for_worker() -> str:
     # --- DEĞİŞİKLİK BURADA BAŞLIYOR ---
     # 1. Öncelik: Ortamdan gelen hazır DATABASE_URL
@@ -43,6 +77,57 @@ def _get_database_url_for_worker() -> str:
     # --- DEĞİŞİKLİK BURADA BİTİYOR ---
 
 
+def _worker_concurrency() -> int:
+    """Worker'ın havuz boyutu; `worker_init` sırasında ana süreçte kaydedilir."""
+    return int(os.getenv("AZURAFORGE_CONCURRENCY", 0) or celery_app.conf.worker_concurrency or os.cpu_count() or 1)
+
+def _apply_worker_thread_budget(pin_cpus: bool) -> None:
+    from billiard.process import current_process
+    from .thread_budget import apply_thread_budget, compute_thread_budget, is_cpu_pinning_enabled, pin_child_affinity
+
+    budget = compute_thread_budget(_worker_concurrency())
+    apply_thread_budget(budget)
+    child_index = getattr(current_process(), "index", None)
+    if pin_cpus and is_cpu_pinning_enabled() and child_index is not None:
+        try:
+            pin_child_affinity(child_index, budget)
+        except OSError as e:
+            print(f"WORKER: CPU affinity could not be set for process {os.getpid()}: {e}")
+
+@worker_process_init.connect
+def init_worker_thread_budget(**kwargs):
+    _apply_worker_thread_budget(pin_cpus=True)
+
+@worker_process_init.connect
+def enable_memory_hard_limit(**kwargs):
+    # worker_process_init yalnızca prefork çocuklarında tetiklenir; sert sınır yalnızca burada uygulanır.
+    from .memory_governor import memory_governor
+    memory_governor.enable_hard_limit_recycling()
+
+@worker_process_init.connect
+def init_worker_redis_pool(**kwargs):
+    from .redis_pool import init_redis_pool
+    init_redis_pool()
+
+@worker_process_shutdown.connect
+def shutdown_worker_redis_pool(**kwargs):
+    from .redis_pool import close_redis_pool
+    close_redis_pool()
+
+@worker_process_shutdown.connect
+def remove_worker_metrics_textfile(**kwargs):
+    from .metrics import metrics_registry
+    metrics_registry.remove_textfile()
+
+@task_postrun.connect
+def govern_worker_memory(task=None, **kwargs):
+    from .memory_governor import memory_governor
+    from .metrics import metrics_enabled, metrics_registry
+    memory_governor.check(task_name=getattr(task, "name", None))
+    # Görev ölçümleri task_postrun'dan önce yazılır; bellek değerleri güncel olsun diye tekrar yazılır.
+    if metrics_enabled():
+        metrics_registry.write_textfile()
+
 @worker_process_init.connect
 def init_worker_db_connection(**kwargs):
     global engine
@@ -67,4 +152,36 @@ def shutdown_worker_db_connection(**kwargs):
     if engine:
         process_id = os.getpid()
         print(f"WORKER: Disposing DB connection for worker process PID: {process_id}...")
-        engine.dispose()
\ No newline at end of file
+        engine.dispose()
+
+def _uses_prefork_pool(worker: Any) -> bool:
+    pool_cls = getattr(worker, "pool_cls", None) or celery_app.conf.worker_pool
+    name = pool_cls if isinstance(pool_cls, str) else getattr(pool_cls, "__module__", "")
+    return "prefork" in name.lower()
+
+@worker_init.connect
+def export_worker_thread_env(sender=None, **kwargs):
+    """
+    Havuz boyutunu (`-c`/`worker_concurrency`) çocuk süreçlere aktarır; böylece worker
+    `start-worker` yerine doğrudan `celery worker` ile başlatıldığında da thread bütçesi
+    gerçek concurrency değerinden hesaplanır.
+    """
+    from .thread_budget import compute_thread_budget, export_thread_env
+
+    concurrency = getattr(sender, "concurrency", None) or celery_app.conf.worker_concurrency
+    if concurrency:
+        os.environ["AZURAFORGE_CONCURRENCY"] = str(concurrency)
+    export_thread_env(compute_thread_budget(_worker_concurrency()))
+
+@worker_init.connect
+def init_resources_for_non_forking_pools(sender=None, **kwargs):
+    """
+    `threads` ve `solo` havuzlarında `worker_process_init` tetiklenmez; bu durumda
+    süreç kaynakları (Redis havuzu, DB bağlantısı) ana süreçte bir kez kurulur.
+    """
+    if _uses_prefork_pool(sender):
+        return
+    # Tek süreçte birden fazla thread çalıştığı için çekirdek sabitleme yapılmaz.
+    _apply_worker_thread_budget(pin_cpus=False)
+    init_worker_redis_pool()
+    init_worker_db_connection()
@@ -0,0 +1,160 @@
+# worker/src/azuraforge_worker/checkpoints.py
+"""
+Bu modül, uzun eğitimlerin worker kaybından (OOM, deploy, node drain) sonra
+kaldığı yerden devam edebilmesi için periyodik checkpoint'leri yönetir.
+
+Checkpoint'ler `experiment_dir/checkpoints/epoch_XXXXXX/` dizinlerine yazılır:
+- `model.bin` (+ manifest): model parametreleri (bkz. model_artifact.py)
+- `optimizer.pkl`: optimizer durumu (optimizer `state_dict()` destekliyorsa)
+- `state.json`: tamamlanan epoch sayısı ve zaman bilgisi
+- `model.json`: yalnızca son epoch'ta ve `MODEL_ARTIFACT_WRITE_JSON` açıksa; eğitim
+  checkpoint'ten tamamlanırsa `best_model.json` olarak kopyalanır
+
+Dizin önce geçici bir isimle yazılır ve tamamlanınca yeniden adlandırılır; bu
+sayede yarım kalmış bir checkpoint hiçbir zaman "en son" olarak görülmez.
+"""
+import json
+import logging
+import os
+import pickle
+import shutil
+import time
+from typing import Any, Dict, Optional
+
+from .model_artifact import (BINARY_MODEL_FILENAME, JSON_MODEL_FILENAME, is_json_artifact_enabled, manifest_path_for,
+                             save_binary_model, load_binary_model)
+from .redis_pool import get_redis
+
+CHECKPOINT_DIRNAME = "checkpoints"
+_MODEL_FILENAME = "model.bin"
+_JSON_MODEL_FILENAME = "model.json"
+_OPTIMIZER_FILENAME = "optimizer.pkl"
+_STATE_FILENAME = "state.json"
+_EPOCH_PREFIX = "epoch_"
+
+
+class TrainingAttemptsExceeded(RuntimeError):
+    """Görev, izin verilen sayıdan fazla yeniden teslim edildi (ör. her denemede OOM ile öldü)."""
+    error_code = "MAX_ATTEMPTS_EXCEEDED"
+
+
+def is_checkpointing_enabled() -> bool:
+    return os.getenv("CHECKPOINT_ENABLED", "true").lower() in ("1", "true", "yes")
+
+
+def max_training_attempts() -> int:
+    return max(1, int(os.getenv("TRAINING_MAX_ATTEMPTS", 3)))
+
+
+def record_training_attempt(task_id: str) -> int:
+    """Görevin kaçıncı kez çalıştırıldığını Redis'te sayar ve bu denemenin numarasını döndürür."""
+    key = f"training-attempts:{task_id}"
+    pipe = get_redis().pipeline()
+    pipe.incr(key)
+    pipe.expire(key, int(os.getenv("BROKER_VISIBILITY_TIMEOUT_SECONDS", 24 * 3600)) * max_training_attempts())
+    return int(pipe.execute()[0])
+
+
+def checkpoint_root(experiment_dir: str) -> str:
+    return os.path.join(experiment_dir, CHECKPOINT_DIRNAME)
+
+
+def _completed_checkpoints(experiment_dir: str):
+    root = checkpoint_root(experiment_dir)
+    try:
+        names = os.listdir(root)
+    except FileNotFoundError:
+        return []
+    return sorted(os.path.join(root, name) for name in names
+                  if name.startswith(_EPOCH_PREFIX) and not name.endswith(".tmp"))
+
+
+def save_checkpoint(learner: Any, experiment_dir: str, epoch: int, total_epochs: Optional[int] = None,
+                    progress: Optional[Dict[str, Any]] = None, final: bool = False) -> str:
+    """
+    Learner ve optimizer durumunu yazar, eski checkpoint'leri siler; yeni dizini döndürür.
+    `progress`, son epoch'un skaler ilerleme değerleridir (loss vb.). `final` son epoch'u
+    belirtir; bu checkpoint nihai model olarak kullanılabileceği için JSON da yazılabilir.
+    """
+    root = checkpoint_root(experiment_dir)
+    final_dir = os.path.join(root, f"{_EPOCH_PREFIX}{epoch:06d}")
+    tmp_dir = f"{final_dir}.{os.getpid()}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    save_binary_model(learner, os.path.join(tmp_dir, _MODEL_FILENAME))
+    if final and is_json_artifact_enabled():
+        learner.save_model(os.path.join(tmp_dir, _JSON_MODEL_FILENAME))
+    optimizer = getattr(learner, "optimizer", None)
+    has_optimizer_state = callable(getattr(optimizer, "state_dict", None))
+    if has_optimizer_state:
+        with open(os.path.join(tmp_dir, _OPTIMIZER_FILENAME), "wb") as f:
+            pickle.dump(optimizer.state_dict(), f, protocol=pickle.HIGHEST_PROTOCOL)
+    with open(os.path.join(tmp_dir, _STATE_FILENAME), "w") as f:
+        last_progress = {k: v for k, v in (progress or {}).items()
+                         if v is None or isinstance(v, (bool, int, float, str))}
+        json.dump({"epoch": epoch, "total_epochs": total_epochs, "saved_at": time.time(),
+                   "has_optimizer_state": has_optimizer_state, "last_progress": last_progress}, f)
+
+    shutil.rmtree(final_dir, ignore_errors=True)
+    os.replace(tmp_dir, final_dir)
+    for older in _completed_checkpoints(experiment_dir):
+        if older != final_dir:
+            shutil.rmtree(older, ignore_errors=True)
+    return final_dir
+
+
+def read_latest_checkpoint(experiment_dir: str) -> Optional[Dict[str, Any]]:
+    """En son tamamlanmış checkpoint'in durumunu (`path` alanı ile) döndürür; yoksa None."""
+    for path in reversed(_completed_checkpoints(experiment_dir)):
+        try:
+            with open(os.path.join(path, _STATE_FILENAME)) as f:
+                return {**json.load(f), "path": path}
+        except (FileNotFoundError, json.JSONDecodeError):
+            continue
+    return None
+
+
+def restore_checkpoint(learner: Any, checkpoint: Dict[str, Any]) -> None:
+    """Checkpoint'teki parametreleri ve (varsa) optimizer durumunu learner'a yükler."""
+    path = checkpoint["path"]
+    load_binary_model(learner, os.path.join(path, _MODEL_FILENAME))
+    # Eğitim sırasında ağırlıklar yerinde güncellenir; mmap görünümleri yerine bağımsız kopyalar kullanılır.
+    for param in learner.model.parameters():
+        param.data = param.data.copy()
+
+    optimizer = getattr(learner, "optimizer", None)
+    optimizer_path = os.path.join(path, _OPTIMIZER_FILENAME)
+    if checkpoint.get("has_optimizer_state") and callable(getattr(optimizer, "load_state_dict", None)):
+        with open(optimizer_path, "rb") as f:
+            optimizer.load_state_dict(pickle.load(f))
+    logging.info(f"Restored checkpoint from {path} (epoch {checkpoint.get('epoch')}).")
+
+
+def promote_checkpoint_model(checkpoint: Dict[str, Any], experiment_dir: str) -> str:
+    """
+    Son epoch'ta alınmış bir checkpoint'in modelini, eğitimi tekrar çalıştırmadan
+    deneyin nihai ikili model artifact'i olarak kopyalar ve yolunu döndürür.
+    """
+    source_path = os.path.join(checkpoint["path"], _MODEL_FILENAME)
+    model_path = os.path.join(experiment_dir, BINARY_MODEL_FILENAME)
+    # save_binary_model ile aynı sıra: önce manifest, sonra veri.
+    for source, target in ((manifest_path_for(source_path), manifest_path_for(model_path)), (source_path, model_path)):
+        tmp_target = f"{target}.{os.getpid()}.tmp"
+        shutil.copyfile(source, tmp_target)
+        os.replace(tmp_target, target)
+
+    # Normal tamamlanan deneylerle aynı artifact'ler: JSON isteniyorsa o da kopyalanır.
+    if is_json_artifact_enabled():
+        json_source = os.path.join(checkpoint["path"], _JSON_MODEL_FILENAME)
+        if os.path.exists(json_source):
+            json_target = os.path.join(experiment_dir, JSON_MODEL_FILENAME)
+            shutil.copyfile(json_source, f"{json_target}.{os.getpid()}.tmp")
+            os.replace(f"{json_target}.{os.getpid()}.tmp", json_target)
+        else:
+            logging.warning(f"Checkpoint {checkpoint['path']} has no JSON model; {JSON_MODEL_FILENAME} was not written.")
+    return model_path
+
+
+def clear_checkpoints(experiment_dir: str) -> None:
+    shutil.rmtree(checkpoint_root(experiment_dir), ignore_errors=True)
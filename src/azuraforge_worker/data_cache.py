@@ -0,0 +1,243 @@
+# worker/src/azuraforge_worker/data_cache.py
+"""
+Bu modül, pipeline'ların ham veri setleri için süreç içi (in-process) bir
+önbellek katmanı sunar.
+
+Anahtar, çalıştırmaya özgü alanları (experiment_id, task_id, start_time...)
+içeren tam konfigürasyon değil; pipeline adı ve `get_caching_params()`
+çıktısından üretilen bir veri seti parmak izidir (fingerprint).
+"""
+import hashlib
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows gibi platformlarda süreçler arası kilit yok.
+    fcntl = None
+
+from .dataset_store import CREATED_AT_ATTR, RESIDENT_NBYTES_ATTR
+
+DEFAULT_SHARED_DATA_CACHE_MAX_BYTES = 1024 ** 3  # 1 GiB
+
+
+def make_dataset_key(pipeline_name: str, caching_params: Dict[str, Any]) -> str:
+    """Pipeline adı ve önbellek parametrelerinden kararlı bir veri seti anahtarı üretir."""
+    params_json = json.dumps(caching_params or {}, sort_keys=True, default=str)
+    digest = hashlib.sha1(f"{pipeline_name}|{params_json}".encode("utf-8")).hexdigest()[:16]
+    return f"{pipeline_name}:{digest}"
+
+
+def estimate_nbytes(value: Any) -> int:
+    """Önbelleğe alınan bir nesnenin bellekte kapladığı alanı tahmin eder."""
+    # Bellek eşlemeli veri setleri, yalnızca sürece özel (eşlenmemiş) kısımları kadar yer tutar.
+    attrs = getattr(value, "attrs", None)
+    if isinstance(attrs, dict) and RESIDENT_NBYTES_ATTR in attrs:
+        return int(attrs[RESIDENT_NBYTES_ATTR])
+    memory_usage = getattr(value, "memory_usage", None)
+    if callable(memory_usage):
+        try:
+            usage = memory_usage(deep=True)
+            return int(usage.sum()) if hasattr(usage, "sum") else int(usage)
+        except Exception:
+            pass
+    nbytes = getattr(value, "nbytes", None)
+    if isinstance(nbytes, int):
+        return nbytes
+    return sys.getsizeof(value)
+
+
+def _created_at(value: Any) -> float:
+    """Girdinin oluşturulma zamanı (monotonic); yayın zamanı taşıyan veri setlerinde o an esas alınır."""
+    now = time.monotonic()
+    attrs = getattr(value, "attrs", None)
+    if isinstance(attrs, dict) and CREATED_AT_ATTR in attrs:
+        return now - max(0.0, time.time() - float(attrs[CREATED_AT_ATTR]))
+    return now
+
+
+class _CacheEntry:
+    __slots__ = ("value", "nbytes", "created_at")
+
+    def __init__(self, value: Any, nbytes: int):
+        self.value = value
+        self.nbytes = nbytes
+        self.created_at = _created_at(value)
+
+
+class _InFlightLoad:
+    __slots__ = ("event", "value", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class ByteLRUCache:
+    """
+    Toplam boyutu bayt cinsinden sınırlanan, thread-safe bir LRU önbellek.
+
+    `get_or_load`, aynı anahtar için eşzamanlı gelen istekleri tek bir
+    yükleme çağrısında birleştirir (single-flight).
+    """
+    def __init__(self, max_bytes: int, name: str = "cache",
+                 ttl_seconds: Optional[float] = None, max_entries: Optional[int] = None):
+        self.name = name
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._inflight: Dict[str, _InFlightLoad] = {}
+        self._lock = threading.Lock()
+        self._current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.load_failures = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def _is_expired(self, entry: _CacheEntry, max_age_seconds: Optional[float]) -> bool:
+        limits = [limit for limit in (self.ttl_seconds, max_age_seconds) if limit is not None]
+        if not limits:
+            return False
+        return (time.monotonic() - entry.created_at) > min(limits)
+
+    def _remove(self, key: str) -> Optional[_CacheEntry]:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._current_bytes -= entry.nbytes
+        return entry
+
+    def _lookup(self, key: str, max_age_seconds: Optional[float]) -> Optional[_CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if self._is_expired(entry, max_age_seconds):
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _evict_if_needed(self) -> None:
+        while self._entries and (
+            self._current_bytes > self.max_bytes
+            or (self.max_entries is not None and len(self._entries) > self.max_entries)
+        ):
+            evicted_key, evicted_entry = self._entries.popitem(last=False)
+            self._current_bytes -= evicted_entry.nbytes
+            self.evictions += 1
+            logging.info(f"{self.name}: evicted '{evicted_key}' (current size: {self._current_bytes} bytes).")
+
+    def get(self, key: str, max_age_seconds: Optional[float] = None) -> Any:
+        with self._lock:
+            entry = self._lookup(key, max_age_seconds)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry.value
+
+    def put(self, key: str, value: Any, nbytes: Optional[int] = None) -> None:
+        size = estimate_nbytes(value) if nbytes is None else nbytes
+        with self._lock:
+            self._remove(key)
+            if size > self.max_bytes:
+                logging.warning(f"{self.name}: '{key}' ({size} bytes) exceeds the cache limit; not cached.")
+                return
+            self._entries[key] = _CacheEntry(value, size)
+            self._current_bytes += size
+            self._evict_if_needed()
+
+    def get_or_load(self, key: str, loader: Callable[[], Any],
+                    max_age_seconds: Optional[float] = None) -> Any:
+        with self._lock:
+            entry = self._lookup(key, max_age_seconds)
+            if entry is not None:
+                self.hits += 1
+                return entry.value
+            self.misses += 1
+            flight = self._inflight.get(key)
+            is_leader = flight is None
+            if is_leader:
+                flight = self._inflight[key] = _InFlightLoad()
+            else:
+                self.coalesced += 1
+
+        if not is_leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = loader()
+            self.loads += 1
+            self.put(key, flight.value)
+            return flight.value
+        except BaseException as e:
+            self.load_failures += 1
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.event.set()
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._current_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "name": self.name,
+                "entries": len(self._entries),
+                "current_bytes": self._current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "loads": self.loads,
+                "load_failures": self.load_failures,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+            }
+
+
+@contextmanager
+def interprocess_lock(cache_dir: str, key: str):
+    """
+    Aynı makinedeki prefork çocuk süreçleri arasında, verilen anahtar için
+    dosya tabanlı özel bir kilit tutar. fcntl yoksa hiçbir şey yapmaz.
+    """
+    if fcntl is None:
+        yield
+        return
+    lock_dir = os.path.join(cache_dir, ".locks")
+    os.makedirs(lock_dir, exist_ok=True)
+    lock_path = os.path.join(lock_dir, key.replace(os.sep, "_").replace(":", "_") + ".lock")
+    with open(lock_path, "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+shared_data_cache = ByteLRUCache(
+    max_bytes=int(os.getenv("SHARED_DATA_CACHE_MAX_BYTES", DEFAULT_SHARED_DATA_CACHE_MAX_BYTES)),
+    name="SharedDataCache",
+)
@@ -0,0 +1,83 @@
+# worker/src/azuraforge_worker/data_refresh.py
+"""
+Bu modül, süresi dolmuş zaman serisi veri setlerinin tamamen yeniden indirilmek
+yerine yalnızca yeni satırlarla güncellenmesini (incremental refresh) sağlar.
+
+Bir pipeline bu modu şu şekilde destekler:
+- konfigürasyonda `system.incremental_refresh: true`
+- `_load_data_since(self, since: pd.Timestamp) -> pd.DataFrame` metodu; `since`
+  anından sonraki satırları döndürmelidir.
+
+Veri kaynağındaki geçmiş düzeltmelerin kaybolmaması için
+`system.full_refresh_interval_hours` (varsayılan 168) aralıklarla tam yükleme
+(reconciliation) yapılır.
+"""
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, Optional
+
+import pandas as pd
+
+DEFAULT_FULL_REFRESH_INTERVAL_HOURS = 168
+
+
+def supports_incremental_refresh(pipeline_instance: Any) -> bool:
+    system_config = pipeline_instance.config.get("system", {})
+    return bool(system_config.get("incremental_refresh", False)) and callable(
+        getattr(pipeline_instance, "_load_data_since", None)
+    )
+
+
+def _state_path(cache_dir: str, dataset_key: str) -> str:
+    safe_key = dataset_key.replace(os.sep, "_").replace(":", "_")
+    return os.path.join(cache_dir, "refresh_state", f"{safe_key}.json")
+
+
+def read_refresh_state(cache_dir: str, dataset_key: str) -> Dict[str, Any]:
+    try:
+        with open(_state_path(cache_dir, dataset_key)) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def write_refresh_state(cache_dir: str, dataset_key: str, **updates: Any) -> None:
+    path = _state_path(cache_dir, dataset_key)
+    state = {**read_refresh_state(cache_dir, dataset_key), **updates}
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+
+def needs_full_refresh(pipeline_instance: Any, cache_dir: str, dataset_key: str) -> bool:
+    """Son tam yüklemenin üzerinden mutabakat aralığı geçtiyse True döner."""
+    system_config = pipeline_instance.config.get("system", {})
+    interval_hours = system_config.get("full_refresh_interval_hours", DEFAULT_FULL_REFRESH_INTERVAL_HOURS)
+    last_full_refresh = read_refresh_state(cache_dir, dataset_key).get("last_full_refresh")
+    return last_full_refresh is None or (time.time() - last_full_refresh) > interval_hours * 3600
+
+
+def append_new_rows(pipeline_instance: Any, stale_df: pd.DataFrame) -> Optional[pd.DataFrame]:
+    """
+    Eski veri setinin son index zamanından sonraki satırları kaynaktan çeker ve
+    sona ekler. Artımlı güncelleme mümkün değilse None döner.
+    """
+    if not isinstance(stale_df, pd.DataFrame) or stale_df.empty or not isinstance(stale_df.index, pd.DatetimeIndex):
+        return None
+
+    last_timestamp = stale_df.index.max()
+    new_rows = pipeline_instance._load_data_since(last_timestamp)
+    if new_rows is None:
+        return None
+    if new_rows.empty:
+        logging.info(f"Incremental refresh: no rows after {last_timestamp}.")
+        return stale_df
+
+    new_rows = new_rows[new_rows.index > last_timestamp]
+    new_rows = new_rows[~new_rows.index.duplicated(keep="last")].sort_index()
+    logging.info(f"Incremental refresh: appending {len(new_rows)} rows after {last_timestamp}.")
+    return pd.concat([stale_df, new_rows[stale_df.columns]])
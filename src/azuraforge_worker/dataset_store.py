@@ -0,0 +1,224 @@
+# worker/src/azuraforge_worker/dataset_store.py
+"""
+Bu modül, prefork çocuk süreçlerinin aynı veri setini ortak bellek üzerinden
+paylaşabilmesi için sütun bazlı, bellek eşlemeli (memory-mapped) bir veri seti
+deposu sunar.
+
+Her veri seti `CACHE_DIR/datasets/<anahtar>/<versiyon>/` altında sütun başına
+bir `.npy` dosyası ve küçük bir `manifest.json` olarak bir kez yazılır. Geçerli
+versiyon, atomik olarak değiştirilen `CURRENT` dosyasıyla işaretlenir. Okuyucular
+dosyaları `mmap_mode='c'` ile eşler; böylece sayfalar işletim sisteminin sayfa
+önbelleğinden tüm süreçlerce paylaşılır ve yanlışlıkla yapılan yazmalar yalnızca
+o sürecin özel kopyasını etkiler.
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+import uuid
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+MANIFEST_FILENAME = "manifest.json"
+CURRENT_FILENAME = "CURRENT"
+RESIDENT_NBYTES_ATTR = "azuraforge_resident_nbytes"
+DATASET_VERSION_ATTR = "azuraforge_dataset_version"
+CREATED_AT_ATTR = "azuraforge_created_at"
+
+
+def content_fingerprint(df: pd.DataFrame) -> str:
+    """
+    Index ve değerlerden hesaplanan kısa içerik özeti; geçmiş satırları düzelten
+    yenilemelerde (satır sayısı ve son zaman aynı kalsa da) değişir.
+    """
+    try:
+        hashed = pd.util.hash_pandas_object(df, index=True).to_numpy()
+    except TypeError:
+        # Hash'lenemeyen (ör. liste içeren) sütunlarda her yükleme yeni bir sürüm sayılır.
+        return uuid.uuid4().hex[:16]
+    digest = hashlib.sha1(json.dumps([str(c) for c in df.columns]).encode("utf-8"))
+    digest.update(hashed.tobytes())
+    return digest.hexdigest()[:16]
+
+
+def _safe_dirname(key: str) -> str:
+    return key.replace(os.sep, "_").replace(":", "_")
+
+
+def _is_mmap_backed(array: Any) -> bool:
+    base = array
+    while base is not None:
+        if isinstance(base, np.memmap):
+            return True
+        base = getattr(base, "base", None)
+    return False
+
+
+class SharedDatasetStore:
+    """DataFrame'leri sütun bazlı `.npy` dosyaları olarak yazar ve salt-okunur eşler."""
+
+    def __init__(self, root_dir: str):
+        self.root_dir = root_dir
+
+    def _dataset_dir(self, key: str) -> str:
+        return os.path.join(self.root_dir, _safe_dirname(key))
+
+    def _current_version_dir(self, key: str) -> Optional[str]:
+        dataset_dir = self._dataset_dir(key)
+        try:
+            with open(os.path.join(dataset_dir, CURRENT_FILENAME)) as f:
+                version = f.read().strip()
+        except FileNotFoundError:
+            return None
+        return os.path.join(dataset_dir, version) if version else None
+
+    @staticmethod
+    def is_storable(df: Any) -> bool:
+        """Veri setinin bu depoda saklanabilir olup olmadığını kontrol eder."""
+        if not isinstance(df, pd.DataFrame) or df.empty or df.columns.has_duplicates:
+            return False
+        try:
+            json.dumps(list(df.columns))
+        except TypeError:
+            return False
+        return not isinstance(df.index, pd.MultiIndex)
+
+    def load(self, key: str, max_age_seconds: Optional[float] = None) -> Optional[pd.DataFrame]:
+        """Geçerli versiyonu bellek eşlemeli bir DataFrame olarak döndürür; yoksa None."""
+        version_dir = self._current_version_dir(key)
+        if version_dir is None:
+            return None
+        try:
+            with open(os.path.join(version_dir, MANIFEST_FILENAME)) as f:
+                manifest = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+        if max_age_seconds is not None and (time.time() - manifest["created_at"]) > max_age_seconds:
+            return None
+
+        try:
+            return self._read_version(version_dir, manifest)
+        except FileNotFoundError:
+            # Versiyon, okuma sırasında yenisiyle değiştirilip temizlenmiş olabilir.
+            return None
+
+    def _read_version(self, version_dir: str, manifest: Dict[str, Any]) -> pd.DataFrame:
+        def _load_array(entry: Dict[str, Any]) -> np.ndarray:
+            path = os.path.join(version_dir, entry["file"])
+            if entry["mmap"]:
+                return np.load(path, mmap_mode="c")
+            return np.load(path, allow_pickle=True)
+
+        index_meta = manifest["index"]
+        index_values = _load_array(index_meta)
+        if index_meta["kind"] == "datetime":
+            unit = index_meta.get("unit", "ns")
+            index = pd.DatetimeIndex(index_values.view(f"datetime64[{unit}]"), name=index_meta["name"])
+            if index_meta.get("tz"):
+                index = index.tz_localize("UTC").tz_convert(index_meta["tz"])
+        else:
+            index = pd.Index(index_values, name=index_meta["name"])
+
+        columns = {}
+        resident_nbytes = 0 if _is_mmap_backed(index_values) else int(index_values.nbytes)
+        for entry in manifest["columns"]:
+            values = _load_array(entry)
+            if not entry["mmap"]:
+                resident_nbytes += int(values.nbytes)
+            columns[entry["name"]] = values
+
+        # copy=False ile her sütun, eşlenmiş dizinin üzerinde ayrı bir blok olarak kalır.
+        df = pd.DataFrame(columns, index=index, copy=False)
+        for entry in manifest["columns"]:
+            # pandas 3, object dizilerden 'str' tipi çıkarır; yazılan pandas tipi geri yüklenir.
+            pandas_dtype = entry.get("pandas_dtype")
+            if pandas_dtype and str(df[entry["name"]].dtype) != pandas_dtype:
+                try:
+                    df[entry["name"]] = df[entry["name"]].astype(pandas_dtype)
+                except (TypeError, ValueError):
+                    pass
+        df.attrs[RESIDENT_NBYTES_ATTR] = resident_nbytes
+        df.attrs[DATASET_VERSION_ATTR] = manifest.get("content_hash") or os.path.basename(version_dir)
+        # Süreç içi önbellekler verinin yaşını eşlendiği andan değil, yayınlandığı andan sayar.
+        df.attrs[CREATED_AT_ATTR] = manifest["created_at"]
+        return df
+
+    def publish(self, key: str, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Veri setini yeni bir versiyon olarak yazar, atomik olarak geçerli yapar ve
+        bellek eşlemeli halini döndürür.
+        """
+        dataset_dir = self._dataset_dir(key)
+        os.makedirs(dataset_dir, exist_ok=True)
+        version = f"v{time.time_ns()}-{uuid.uuid4().hex[:8]}"
+        tmp_dir = os.path.join(dataset_dir, f".tmp-{version}")
+        os.makedirs(tmp_dir)
+
+        def _write_array(filename: str, values: np.ndarray) -> Dict[str, Any]:
+            mmap_ok = values.dtype != object
+            np.save(os.path.join(tmp_dir, filename), np.ascontiguousarray(values), allow_pickle=not mmap_ok)
+            return {"file": filename, "dtype": str(values.dtype), "mmap": mmap_ok}
+
+        try:
+            if isinstance(df.index, pd.DatetimeIndex):
+                tz = str(df.index.tz) if df.index.tz is not None else None
+                # pandas 2+ ile index 's'/'ms'/'us' çözünürlüğünde olabilir; asi8 bu birimdeki
+                # tamsayıları döndürdüğü için birim kaydedilir ve okurken aynen geri kurulur.
+                unit = getattr(df.index, "unit", "ns")
+                index_meta = _write_array("index.npy", df.index.asi8)
+                index_meta.update({"kind": "datetime", "tz": tz, "unit": unit})
+            else:
+                index_meta = _write_array("index.npy", df.index.to_numpy())
+                index_meta["kind"] = "plain"
+            index_meta["name"] = df.index.name
+
+            column_entries = []
+            for i, name in enumerate(df.columns):
+                entry = _write_array(f"col_{i:04d}.npy", df[name].to_numpy())
+                entry.update({"name": name, "pandas_dtype": str(df[name].dtype)})
+                column_entries.append(entry)
+
+            manifest = {
+                "key": key,
+                "created_at": time.time(),
+                "rows": len(df),
+                "content_hash": content_fingerprint(df),
+                "index": index_meta,
+                "columns": column_entries,
+            }
+            with open(os.path.join(tmp_dir, MANIFEST_FILENAME), "w") as f:
+                json.dump(manifest, f)
+
+            version_dir = os.path.join(dataset_dir, version)
+            os.rename(tmp_dir, version_dir)
+
+            current_tmp = os.path.join(dataset_dir, f".{CURRENT_FILENAME}.{version}")
+            with open(current_tmp, "w") as f:
+                f.write(version)
+            os.replace(current_tmp, os.path.join(dataset_dir, CURRENT_FILENAME))
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+        self._remove_stale_versions(dataset_dir, keep=version)
+        logging.info(f"SharedDatasetStore: published '{key}' ({len(df)} rows) as {version}.")
+        return self._read_version(version_dir, manifest)
+
+    @staticmethod
+    def _remove_stale_versions(dataset_dir: str, keep: str) -> None:
+        # Eski versiyonları eşlemiş süreçler, dosyalar silinse de eşlemelerini korur.
+        for name in os.listdir(dataset_dir):
+            if name.startswith("v") and name != keep:
+                shutil.rmtree(os.path.join(dataset_dir, name), ignore_errors=True)
+
+
+def is_shared_dataset_store_enabled() -> bool:
+    return os.getenv("SHARED_DATASET_STORE", "true").lower() in ("1", "true", "yes")
+
+
+shared_dataset_store = SharedDatasetStore(os.path.join(os.getenv("CACHE_DIR", ".cache"), "datasets"))
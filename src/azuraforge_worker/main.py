@@ -1,12 +1,17 @@
 # worker/src/azuraforge_worker/main.py
 
+import argparse
 import logging
 import sys
 import platform
 import multiprocessing
 import os
+from typing import List
 
-from .celery_app import celery_app
+from .celery_app import celery_app, DEFAULT_QUEUE, TRAIN_QUEUE, PREDICT_QUEUE
+from .thread_budget import compute_thread_budget, export_thread_env
+
+WORKER_MODES = ("all", "train", "predict")
 
 def get_concurrency() -> int: # <-- Dönüş tipini int olarak güncelledik
     """Cihaz türüne göre uygun concurrency değerini belirler."""
@@ -21,6 +26,44 @@ def get_concurrency() -> int: # <-- Dönüş tipini int olarak güncelledik
         logging.info(f"CPU modu aktif. Concurrency = {concurrency} (CPU çekirdek sayısı / 2).")
         return concurrency
 
+def build_worker_argv(mode: str) -> List[str]:
+    """
+    Çalışma moduna göre dinlenecek kuyrukları, havuz tipini ve concurrency'yi belirler.
+
+    - train:   eğitim ve yönlendirilmemiş (varsayılan kuyruk) görevler; prefork, prefetch=1
+    - predict: tahmin görevleri; thread havuzu, düşük gecikme
+    - all:     tüm kuyruklar; prefork, prefetch=1 (eski tek-worker kurulumu)
+    """
+    if mode == "predict":
+        queues = [PREDICT_QUEUE]
+        pool = "threads"
+        concurrency = int(os.environ.get("PREDICT_CONCURRENCY", 8))
+        prefetch = int(os.environ.get("PREDICT_PREFETCH_MULTIPLIER", 4))
+    else:
+        queues = [TRAIN_QUEUE, DEFAULT_QUEUE] if mode == "train" else [TRAIN_QUEUE, PREDICT_QUEUE, DEFAULT_QUEUE]
+        pool = "prefork"
+        concurrency = int(os.environ.get("TRAIN_CONCURRENCY", 0)) or get_concurrency()
+        # Uzun görevlerde her çocuk süreç aynı anda yalnızca bir görevi rezerve etmeli.
+        prefetch = 1
+
+    # Çocuk süreçler thread bütçesini bu değerden hesaplar (bkz. thread_budget.py).
+    os.environ["AZURAFORGE_CONCURRENCY"] = str(concurrency)
+    export_thread_env(compute_thread_budget(concurrency))
+
+    worker_argv = [
+        'worker',
+        '--loglevel=info',
+        f'--hostname={mode}@%h',
+        f'--queues={",".join(queues)}',
+        f'--pool={pool}',
+        f'--concurrency={concurrency}', # <-- Artık tamsayı gelecek
+        f'--prefetch-multiplier={prefetch}',
+    ]
+    if pool == "prefork":
+        # Boştaki çocuk süreçlere görev verilmesini sağlar; uzun görevlerin kısa olanları bloklamasını önler.
+        worker_argv.append('-Ofair')
+    return worker_argv
+
 def run_azuraforge_worker():
     """
     Bu fonksiyon, worker'ı programatik olarak, subprocess kullanmadan başlatır.
@@ -30,17 +73,21 @@ def run_azuraforge_worker():
         format='%(asctime)s - %(name)s:%(lineno)d - %(levelname)s - %(message)s',
         stream=sys.stdout
     )
-    logging.info("👷‍♂️ Starting AzuraForge Worker via Celery's programmatic API...")
-    
+    parser = argparse.ArgumentParser(prog="start-worker")
+    parser.add_argument(
+        "--mode", choices=WORKER_MODES,
+        default=os.environ.get("AZURAFORGE_WORKER_MODE", "all"),
+        help="Hangi kuyrukların dinleneceği: 'train', 'predict' veya 'all'.",
+    )
+    args, _ = parser.parse_known_args()
+
+    logging.info(f"👷‍♂️ Starting AzuraForge Worker via Celery's programmatic API (mode: {args.mode})...")
+
     # Celery worker'ını başlatmak için argüman listesi oluştur
-    worker_argv = [
-        'worker',
-        '--loglevel=info',
-        f'--concurrency={get_concurrency()}', # <-- Artık tamsayı gelecek
-    ]
-    
+    worker_argv = build_worker_argv(args.mode)
+
     # Celery uygulamasının worker_main metodunu bu argümanlarla çağır
     celery_app.worker_main(argv=worker_argv)
 
 if __name__ == "__main__":
-    run_azuraforge_worker()
\ No newline at end of file
+    run_azuraforge_worker()
@@ -0,0 +1,169 @@
+# worker/src/azuraforge_worker/memory_governor.py
+"""
+Bu modül, uzun süre çalışan worker süreçlerinin bellek büyümesini sınırlar.
+
+Her görevden sonra (`task_postrun`) sürecin özel (anonim) belleği ölçülür. RSS
+yerine bu değer kullanılır; çünkü RSS, paylaşımlı veri seti deposundan bellek
+eşlemeli olarak okunan ve tüm çocuklarca paylaşılan dosya sayfalarını da sayar.
+- Yumuşak sınır (`MEMORY_SOFT_LIMIT_MB`) aşıldıysa kayıtlı önbellekler
+  (veri seti ve predictor önbellekleri) sırayla boşaltılır; her adımdan sonra
+  bellek yeniden ölçülür ve sınırın altına inildiğinde durulur.
+- Sert sınır (`MEMORY_HARD_LIMIT_MB`) Celery'nin `worker_max_memory_per_child`
+  ayarına aktarılır. Bu ayar yalnızca prefork havuzunda geçerlidir ve Celery
+  özel belleği değil, sürecin en yüksek RSS değerini (`ru_maxrss`) karşılaştırır;
+  bu değer eşlenmiş veri seti sayfalarını da içerir. En yüksek RSS sınırı bir
+  kez aştıysa çocuk süreç, önbellekler boşaltılsa da mevcut görev bittikten
+  sonra yenisiyle değiştirilir. Sert sınır bu yüzden özel bellek artı eşlenen
+  veri setlerinin boyutundan yüksek seçilmelidir. `threads`/`solo` havuzlarında
+  sert sınır hiçbir şeyi yeniden başlatmaz; yalnızca uyarı üretilir.
+
+Sınırlar 0 ise ilgili davranış kapalıdır.
+"""
+import ctypes
+import gc
+import logging
+import os
+import resource
+import sys
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+_MB = 1024 ** 2
+
+
+def current_private_bytes() -> int:
+    """
+    Sürecin bellekte duran özel (anonim) sayfaları; eşlenmiş dosya sayfaları sayılmaz.
+    `RssAnon` yoksa RSS eksi paylaşılan sayfalara, /proc yoksa en yüksek RSS değerine düşer.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("RssAnon:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            fields = f.read().split()
+        return (int(fields[1]) - int(fields[2])) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return peak_rss_bytes()
+
+
+def peak_rss_bytes() -> int:
+    """Sürecin en yüksek RSS değeri; Celery'nin `worker_max_memory_per_child` kontrolünün kullandığı ölçü."""
+    # macOS'ta ru_maxrss bayt, Linux'ta KiB cinsindendir.
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def _release_freed_memory() -> None:
+    gc.collect()
+    try:
+        # glibc, serbest bırakılan heap sayfalarını kendiliğinden işletim sistemine iade etmeyebilir.
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+
+
+class MemoryGovernor:
+    """Görev sonlarında özel belleği ölçer, yumuşak sınırın üzerinde önbellekleri boşaltır."""
+
+    def __init__(self, soft_limit_bytes: int, hard_limit_bytes: int):
+        self.soft_limit_bytes = soft_limit_bytes
+        self.hard_limit_bytes = hard_limit_bytes
+        self._shedders: List[Tuple[str, Callable[[], Any]]] = []
+        self._lock = threading.Lock()
+        self.checks = 0
+        self.sheds = 0
+        self.shed_freed_bytes = 0
+        # Sert sınırı yalnızca prefork çocuk süreçlerinde Celery uygular (bkz. enable_hard_limit_recycling).
+        self.recycles_on_hard_limit = False
+        self.hard_limit_recycles = 0
+        self.over_hard_limit_unenforced = 0
+        self.last_private_bytes = 0
+        self.peak_private_bytes = 0
+
+    def enable_hard_limit_recycling(self) -> None:
+        """Prefork çocuk süreçlerinde çağrılır; sert sınır burada Celery tarafından uygulanır."""
+        self.recycles_on_hard_limit = True
+
+    def register_shedder(self, name: str, shed: Callable[[], Any]) -> None:
+        """Yumuşak sınır aşıldığında çağrılacak bir boşaltma fonksiyonu kaydeder (kayıt sırasıyla)."""
+        self._shedders = [(n, s) for n, s in self._shedders if n != name] + [(name, shed)]
+
+    def check(self, task_name: Optional[str] = None) -> int:
+        """Özel belleği ölçer, gerekiyorsa önbellekleri boşaltır ve son ölçülen değeri döndürür."""
+        # Aynı anda birden fazla thread'in boşaltma yapması gereksizdir.
+        if not self._lock.acquire(blocking=False):
+            return self.last_private_bytes
+        try:
+            private = current_private_bytes()
+            self.checks += 1
+            self.peak_private_bytes = max(self.peak_private_bytes, private)
+            if self.soft_limit_bytes > 0 and private > self.soft_limit_bytes:
+                private = self._shed(private, task_name)
+            if self.hard_limit_bytes > 0:
+                self._check_hard_limit(private, task_name)
+            self.last_private_bytes = private
+            return private
+        finally:
+            self._lock.release()
+
+    def _check_hard_limit(self, private: int, task_name: Optional[str]) -> None:
+        peak = peak_rss_bytes()
+        limit_mb = self.hard_limit_bytes / _MB
+        if self.recycles_on_hard_limit:
+            # Celery en yüksek RSS'e (eşlenmiş veri seti sayfaları dahil) bakar; boşaltma
+            # özel belleği düşürse de çocuk süreç yenilenir.
+            if peak > self.hard_limit_bytes:
+                self.hard_limit_recycles += 1
+                logging.warning(f"MemoryGovernor: PID {os.getpid()} peak RSS {peak / _MB:.0f} MiB (private {private / _MB:.0f} MiB, "
+                                f"the rest is mapped dataset pages and other file-backed memory) is above the hard limit "
+                                f"{limit_mb:.0f} MiB after task '{task_name}'; Celery will replace this child process.")
+        elif private > self.hard_limit_bytes:
+            self.over_hard_limit_unenforced += 1
+            logging.warning(f"MemoryGovernor: PID {os.getpid()} private memory {private / _MB:.0f} MiB is above the hard limit "
+                            f"{limit_mb:.0f} MiB after task '{task_name}', but the hard limit only applies to "
+                            f"prefork children; this process will not be restarted.")
+
+    def _shed(self, private: int, task_name: Optional[str]) -> int:
+        logging.info(f"MemoryGovernor: PID {os.getpid()} private memory {private / _MB:.0f} MiB is above the soft limit "
+                     f"{self.soft_limit_bytes / _MB:.0f} MiB after task '{task_name}'; shedding caches.")
+        for name, shed in self._shedders:
+            before = private
+            try:
+                shed()
+            except Exception as e:
+                logging.warning(f"MemoryGovernor: shedding '{name}' failed: {e}")
+                continue
+            _release_freed_memory()
+            private = current_private_bytes()
+            self.sheds += 1
+            self.shed_freed_bytes += max(0, before - private)
+            logging.info(f"MemoryGovernor: shed '{name}', private memory {before / _MB:.0f} -> {private / _MB:.0f} MiB.")
+            if private <= self.soft_limit_bytes:
+                break
+        return private
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "private_bytes": self.last_private_bytes,
+            "peak_private_bytes": self.peak_private_bytes,
+            "peak_rss_bytes": peak_rss_bytes(),
+            "soft_limit_bytes": self.soft_limit_bytes,
+            "hard_limit_bytes": self.hard_limit_bytes,
+            "checks": self.checks,
+            "sheds": self.sheds,
+            "shed_freed_bytes": self.shed_freed_bytes,
+            "recycles_on_hard_limit": self.recycles_on_hard_limit,
+            "hard_limit_recycles": self.hard_limit_recycles,
+            "over_hard_limit_unenforced": self.over_hard_limit_unenforced,
+        }
+
+
+memory_governor = MemoryGovernor(
+    soft_limit_bytes=int(os.getenv("MEMORY_SOFT_LIMIT_MB", 0)) * _MB,
+    hard_limit_bytes=int(os.getenv("MEMORY_HARD_LIMIT_MB", 0)) * _MB,
+)
@@ -0,0 +1,201 @@
+# worker/src/azuraforge_worker/metrics.py
+"""
+Bu modül, görevlerin sıcak yollarındaki aşama sürelerini ve sayaçlarını
+toplar ve her worker süreci için Prometheus textfile formatında dışa aktarır.
+
+`AZURAFORGE_METRICS_ENABLED` kapalıyken görevler, hiçbir şey yapmayan bir
+ölçüm nesnesi alır; böylece ek maliyet birkaç metot çağrısıyla sınırlı kalır.
+Dışa aktarma için `METRICS_TEXTFILE_DIR` ayarlanmalıdır (ör. node_exporter'ın
+textfile collector dizini).
+"""
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from typing import Any, Callable, Dict, Optional, Tuple
+
+_NULL_CONTEXT = nullcontext()
+
+
+def metrics_enabled() -> bool:
+    return os.getenv("AZURAFORGE_METRICS_ENABLED", "false").lower() in ("1", "true", "yes")
+
+
+class TaskMetrics:
+    """Tek bir görev çalıştırması için aşama süreleri, sayaçlar ve anlık değerler."""
+    enabled = True
+
+    def __init__(self, task_name: str):
+        self.task_name = task_name
+        self.phases: Dict[str, float] = {}
+        self.counters: Dict[str, float] = defaultdict(float)
+        self.values: Dict[str, float] = {}
+        self._started_at = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + (time.perf_counter() - start)
+
+    def incr(self, name: str, value: float = 1) -> None:
+        self.counters[name] += value
+
+    def set(self, name: str, value: float) -> None:
+        self.values[name] = value
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "total_seconds": round(time.perf_counter() - self._started_at, 6),
+            "phases_seconds": {name: round(seconds, 6) for name, seconds in self.phases.items()},
+            "counters": dict(self.counters),
+            "values": dict(self.values),
+        }
+
+    def finish(self, status: str) -> None:
+        """Görev sonucunu süreç kayıt defterine işler ve textfile'ı günceller."""
+        metrics_registry.record_task(self, status)
+        metrics_registry.write_textfile()
+
+
+class _NullTaskMetrics:
+    """Ölçüm kapalıyken kullanılan, hiçbir şey yapmayan ölçüm nesnesi."""
+    enabled = False
+
+    def phase(self, name: str):
+        return _NULL_CONTEXT
+
+    def incr(self, name: str, value: float = 1) -> None:
+        pass
+
+    def set(self, name: str, value: float) -> None:
+        pass
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {}
+
+    def finish(self, status: str) -> None:
+        pass
+
+
+_NULL_TASK_METRICS = _NullTaskMetrics()
+
+
+def start_task_metrics(task_name: str):
+    return TaskMetrics(task_name) if metrics_enabled() else _NULL_TASK_METRICS
+
+
+def _escape_label(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Dict[str, Any]) -> str:
+    return ",".join(f'{key}="{_escape_label(value)}"' for key, value in labels.items())
+
+
+class ProcessMetricsRegistry:
+    """Worker süreci boyunca görev ölçümlerini biriktirir ve Prometheus formatında sunar."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._phase_sums: Dict[Tuple[str, str], float] = defaultdict(float)
+        self._phase_counts: Dict[Tuple[str, str], int] = defaultdict(int)
+        self._counters: Dict[Tuple[str, str], float] = defaultdict(float)
+        self._last_values: Dict[Tuple[str, str], float] = {}
+        self._tasks: Dict[Tuple[str, str], int] = defaultdict(int)
+        self._gauge_providers: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+    def register_gauge_provider(self, component: str, provider: Callable[[], Dict[str, Any]]) -> None:
+        """Dışa aktarma anında okunacak sayısal durum değerleri sağlayan bir fonksiyon kaydeder."""
+        self._gauge_providers[component] = provider
+
+    def record_task(self, metrics: TaskMetrics, status: str) -> None:
+        task = metrics.task_name
+        with self._lock:
+            self._tasks[(task, status)] += 1
+            for phase, seconds in metrics.phases.items():
+                self._phase_sums[(task, phase)] += seconds
+                self._phase_counts[(task, phase)] += 1
+            for name, value in metrics.counters.items():
+                self._counters[(task, name)] += value
+            for name, value in metrics.values.items():
+                self._last_values[(task, name)] = value
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Biriken değerleri `görev -> ad -> değer` biçiminde döndürür."""
+        def _nest(items: Dict[Tuple[str, str], Any]) -> Dict[str, Dict[str, Any]]:
+            nested: Dict[str, Dict[str, Any]] = defaultdict(dict)
+            for (task, name), value in items.items():
+                nested[task][name] = value
+            return dict(nested)
+
+        with self._lock:
+            return {
+                "tasks": _nest(self._tasks),
+                "phase_seconds_sum": _nest(self._phase_sums),
+                "phase_counts": _nest(self._phase_counts),
+                "counters": _nest(self._counters),
+                "last_values": _nest(self._last_values),
+            }
+
+    def render_prometheus(self) -> str:
+        pid = os.getpid()
+        lines = []
+        with self._lock:
+            lines.append("# TYPE azuraforge_worker_tasks_total counter")
+            for (task, status), count in sorted(self._tasks.items()):
+                lines.append(f"azuraforge_worker_tasks_total{{{_format_labels({'pid': pid, 'task': task, 'status': status})}}} {count}")
+            lines.append("# TYPE azuraforge_worker_task_phase_seconds summary")
+            for (task, phase), total in sorted(self._phase_sums.items()):
+                labels = _format_labels({'pid': pid, 'task': task, 'phase': phase})
+                lines.append(f"azuraforge_worker_task_phase_seconds_sum{{{labels}}} {total}")
+                lines.append(f"azuraforge_worker_task_phase_seconds_count{{{labels}}} {self._phase_counts[(task, phase)]}")
+            lines.append("# TYPE azuraforge_worker_task_counter_total counter")
+            for (task, name), value in sorted(self._counters.items()):
+                lines.append(f"azuraforge_worker_task_counter_total{{{_format_labels({'pid': pid, 'task': task, 'counter': name})}}} {value}")
+            lines.append("# TYPE azuraforge_worker_task_last_value gauge")
+            for (task, name), value in sorted(self._last_values.items()):
+                lines.append(f"azuraforge_worker_task_last_value{{{_format_labels({'pid': pid, 'task': task, 'metric': name})}}} {value}")
+
+        lines.append("# TYPE azuraforge_worker_component_value gauge")
+        for component, provider in sorted(self._gauge_providers.items()):
+            try:
+                values = provider()
+            except Exception as e:
+                logging.warning(f"Metrics: gauge provider '{component}' failed: {e}")
+                continue
+            for name, value in sorted(values.items()):
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    lines.append(f"azuraforge_worker_component_value{{{_format_labels({'pid': pid, 'component': component, 'metric': name})}}} {value}")
+        return "\n".join(lines) + "\n"
+
+    def textfile_path(self) -> Optional[str]:
+        textfile_dir = os.getenv("METRICS_TEXTFILE_DIR")
+        if not textfile_dir:
+            return None
+        return os.path.join(textfile_dir, f"azuraforge_worker_{os.getpid()}.prom")
+
+    def write_textfile(self) -> None:
+        path = self.textfile_path()
+        if path is None:
+            return
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w") as f:
+                f.write(self.render_prometheus())
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logging.warning(f"Metrics: textfile could not be written to '{path}': {e}")
+
+    def remove_textfile(self) -> None:
+        path = self.textfile_path()
+        if path is not None and os.path.exists(path):
+            os.remove(path)
+
+
+metrics_registry = ProcessMetricsRegistry()
@@ -0,0 +1,136 @@
+# worker/src/azuraforge_worker/model_artifact.py
+"""
+Bu modül, eğitilmiş model ağırlıklarını JSON yerine ikili (binary) bir artifact
+olarak yazar ve tahmin sırasında bellek eşlemeli (memory-mapped) olarak yükler.
+
+Format:
+- `best_model.bin`: tüm parametrelerin ham baytları, art arda ve 64 bayta hizalı
+- `best_model.bin.manifest.json`: her parametrenin shape, dtype ve offset bilgisi
+
+`Experiment.model_path` artifact'in yolunu tutar; format dosya uzantısından
+anlaşılır (`.bin` → binary, `.json` → eski JSON formatı). Eski deneyler JSON ile
+yüklenmeye devam eder.
+"""
+import json
+import logging
+import os
+from typing import Any, Dict, List
+
+import numpy as np
+
+MODEL_FORMAT_BINARY = "binary"
+MODEL_FORMAT_JSON = "json"
+BINARY_MODEL_FILENAME = "best_model.bin"
+JSON_MODEL_FILENAME = "best_model.json"
+MANIFEST_SUFFIX = ".manifest.json"
+MANIFEST_VERSION = 1
+_ALIGNMENT = 64
+
+
+def is_json_artifact_enabled() -> bool:
+    """İkili artifact'in yanına geriye dönük uyumluluk için JSON da yazılsın mı? (varsayılan: hayır)"""
+    return os.getenv("MODEL_ARTIFACT_WRITE_JSON", "false").lower() in ("1", "true", "yes")
+
+
+def detect_model_format(model_path: str) -> str:
+    return MODEL_FORMAT_BINARY if model_path.endswith(".bin") else MODEL_FORMAT_JSON
+
+
+def manifest_path_for(model_path: str) -> str:
+    return f"{model_path}{MANIFEST_SUFFIX}"
+
+
+def _model_parameters(learner: Any) -> List[Any]:
+    return list(learner.model.parameters())
+
+
+def save_binary_model(learner: Any, model_path: str) -> None:
+    """Learner'ın parametrelerini ham bayt dosyası + manifest olarak atomik şekilde yazar."""
+    entries: List[Dict[str, Any]] = []
+    tmp_path = f"{model_path}.{os.getpid()}.tmp"
+    offset = 0
+    with open(tmp_path, "wb") as f:
+        for index, param in enumerate(_model_parameters(learner)):
+            array = np.ascontiguousarray(param.data)
+            padding = (-offset) % _ALIGNMENT
+            if padding:
+                f.write(b"\0" * padding)
+                offset += padding
+            f.write(array.tobytes())
+            entries.append({"index": index, "shape": list(array.shape), "dtype": array.dtype.str,
+                            "offset": offset, "nbytes": array.nbytes})
+            offset += array.nbytes
+
+    manifest = {"version": MANIFEST_VERSION, "format": MODEL_FORMAT_BINARY,
+                "total_bytes": offset, "parameters": entries}
+    manifest_path = manifest_path_for(model_path)
+    tmp_manifest_path = f"{manifest_path}.{os.getpid()}.tmp"
+    with open(tmp_manifest_path, "w") as f:
+        json.dump(manifest, f)
+    # Önce manifest, sonra veri: okuyucu .bin dosyasını gördüğünde manifest hazırdır.
+    os.replace(tmp_manifest_path, manifest_path)
+    os.replace(tmp_path, model_path)
+
+
+def load_binary_model(learner: Any, model_path: str) -> int:
+    """
+    Artifact'i `mmap_mode='c'` ile eşler ve parametrelere kopyasız görünümler atar.
+    Sayfalar yalnızca erişildikçe belleğe alınır; yazmalar dosyaya yansımaz.
+    Yüklenen bayt sayısını döndürür.
+    """
+    with open(manifest_path_for(model_path)) as f:
+        manifest = json.load(f)
+    if manifest.get("version") != MANIFEST_VERSION:
+        raise ValueError(f"Unsupported model manifest version: {manifest.get('version')}")
+
+    params = _model_parameters(learner)
+    entries = manifest["parameters"]
+    if len(entries) != len(params):
+        raise ValueError(f"Model has {len(params)} parameters but artifact has {len(entries)}.")
+
+    blob = np.memmap(model_path, dtype=np.uint8, mode="c") if manifest["total_bytes"] else None
+    for param, entry in zip(params, entries):
+        shape = tuple(entry["shape"])
+        if tuple(np.shape(param.data)) != shape:
+            raise ValueError(f"Parameter {entry['index']} shape mismatch: model {np.shape(param.data)}, artifact {shape}.")
+        if entry["nbytes"] == 0:
+            param.data = np.empty(shape, dtype=np.dtype(entry["dtype"]))
+            continue
+        raw = blob[entry["offset"]:entry["offset"] + entry["nbytes"]]
+        param.data = raw.view(np.dtype(entry["dtype"])).reshape(shape)
+    return manifest["total_bytes"]
+
+
+def save_model_artifacts(learner: Any, experiment_dir: str) -> str:
+    """
+    Modeli ikili formatta (ve istenirse JSON olarak) kaydeder; Experiment.model_path
+    için birincil artifact yolunu döndürür. İkili kayıt yapılamazsa JSON'a düşer.
+    """
+    json_path = os.path.join(experiment_dir, JSON_MODEL_FILENAME)
+    binary_path = os.path.join(experiment_dir, BINARY_MODEL_FILENAME)
+    try:
+        save_binary_model(learner, binary_path)
+    except (AttributeError, TypeError, ValueError) as e:
+        logging.warning(f"Binary model artifact could not be written, falling back to JSON: {e}")
+        learner.save_model(json_path)
+        return json_path
+
+    if is_json_artifact_enabled():
+        learner.save_model(json_path)
+    return binary_path
+
+
+def load_model_artifact(learner: Any, model_path: str) -> str:
+    """Artifact'i formatına göre yükler; ikili yükleme başarısızsa yanındaki JSON'u dener."""
+    if detect_model_format(model_path) == MODEL_FORMAT_BINARY:
+        try:
+            load_binary_model(learner, model_path)
+            return MODEL_FORMAT_BINARY
+        except (OSError, ValueError, KeyError) as e:
+            json_path = os.path.join(os.path.dirname(model_path), JSON_MODEL_FILENAME)
+            if not os.path.exists(json_path):
+                raise
+            logging.warning(f"Binary model artifact '{model_path}' could not be loaded ({e}); using JSON.")
+            model_path = json_path
+    learner.load_model(model_path)
+    return MODEL_FORMAT_JSON
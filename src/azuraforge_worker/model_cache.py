@@ -0,0 +1,93 @@
+# worker/src/azuraforge_worker/model_cache.py
+"""
+Bu modül, `predict_from_model_task` için her worker sürecinde tutulan, tahmine
+hazır (pipeline + eğitilmiş scaler'lar + yüklenmiş Learner) bir önbellek sunar.
+
+Girdiler experiment_id ile anahtarlanır ve model dosyasının mtime değeriyle
+doğrulanır; model yeniden yazıldığında girdi otomatik olarak geçersiz sayılır.
+"""
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from .data_cache import ByteLRUCache
+
+DEFAULT_PREDICTOR_CACHE_MAX_BYTES = 512 * 1024 ** 2  # 512 MiB
+DEFAULT_PREDICTOR_CACHE_TTL_SECONDS = 3600
+DEFAULT_PREDICTOR_CACHE_MAX_ENTRIES = 32
+
+
+def get_model_mtime_ns(model_path: str) -> Optional[int]:
+    try:
+        return os.stat(model_path).st_mtime_ns
+    except OSError:
+        return None
+
+
+class CachedPredictor:
+    """Bir deney için tahmine hazır nesneleri bir arada tutar."""
+
+    def __init__(self, experiment_id: str, pipeline_name: str, config: Dict[str, Any],
+                 model_path: str, pipeline_instance: Any, learner: Any,
+                 is_timeseries: bool, seq_len: int, dataset_key: Optional[str] = None):
+        self.experiment_id = experiment_id
+        self.pipeline_name = pipeline_name
+        self.config = config
+        self.model_path = model_path
+        self.model_mtime_ns = get_model_mtime_ns(model_path)
+        self.pipeline_instance = pipeline_instance
+        self.learner = learner
+        self.is_timeseries = is_timeseries
+        self.seq_len = seq_len
+        self.dataset_key = dataset_key
+        # Ağırlıkların bellekteki boyutu için model dosyasının boyutu yaklaşık bir üst sınırdır.
+        self.nbytes = os.path.getsize(model_path) if self.model_mtime_ns is not None else 0
+        # Aynı predictor'ı kullanan thread'lerin pipeline durumunu bozmasını engeller.
+        self.lock = threading.Lock()
+
+    def is_stale(self) -> bool:
+        return get_model_mtime_ns(self.model_path) != self.model_mtime_ns
+
+
+class PredictorCache:
+    """LRU + TTL + bellek sınırı ile çalışan, süreç içi predictor önbelleği."""
+
+    def __init__(self, max_bytes: int, ttl_seconds: float, max_entries: int):
+        self._cache = ByteLRUCache(max_bytes=max_bytes, name="PredictorCache",
+                                   ttl_seconds=ttl_seconds, max_entries=max_entries)
+
+    def get_or_build(self, experiment_id: str, builder: Callable[[], CachedPredictor]) -> CachedPredictor:
+        predictor = self._cache.get_or_load(experiment_id, builder)
+        if predictor.is_stale():
+            logging.info(f"PredictorCache: model artifact for '{experiment_id}' changed; rebuilding.")
+            self._cache.invalidate(experiment_id)
+            predictor = self._cache.get_or_load(experiment_id, builder)
+        return predictor
+
+    def peek(self, experiment_id: str) -> Optional[CachedPredictor]:
+        """Geçerli bir predictor varsa kurmadan döndürür."""
+        predictor = self._cache.get(experiment_id)
+        if predictor is None or predictor.is_stale():
+            return None
+        return predictor
+
+    @property
+    def hits(self) -> int:
+        return self._cache.hits
+
+    def invalidate(self, experiment_id: str) -> None:
+        self._cache.invalidate(experiment_id)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return self._cache.stats()
+
+
+predictor_cache = PredictorCache(
+    max_bytes=int(os.getenv("PREDICTOR_CACHE_MAX_BYTES", DEFAULT_PREDICTOR_CACHE_MAX_BYTES)),
+    ttl_seconds=float(os.getenv("PREDICTOR_CACHE_TTL_SECONDS", DEFAULT_PREDICTOR_CACHE_TTL_SECONDS)),
+    max_entries=int(os.getenv("PREDICTOR_CACHE_MAX_ENTRIES", DEFAULT_PREDICTOR_CACHE_MAX_ENTRIES)),
+)
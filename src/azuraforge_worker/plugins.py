@@ -0,0 +1,168 @@
+# worker/src/azuraforge_worker/plugins.py
+"""
+Bu modül, `azuraforge.pipelines` ve `azuraforge.configs` entry_point'leri
+üzerinden kurulan pipeline eklentilerini keşfeder.
+
+Keşif iki aşamaya ayrılmıştır:
+1. Katalog (id, varsayılan konfigürasyon, form şeması), kurulu dağıtımların
+   versiyonlarıyla geçersiz kılınan bir disk manifestinden ucuza üretilir.
+2. Pipeline sınıfları, bir görev onlara ilk kez ihtiyaç duyduğunda yüklenir.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections.abc import Mapping
+from importlib import resources
+from importlib.metadata import EntryPoint, entry_points
+from typing import Any, Dict, Iterator, Optional
+
+PIPELINES_EP_GROUP = "azuraforge.pipelines"
+CONFIGS_EP_GROUP = "azuraforge.configs"
+MANIFEST_VERSION = 1
+
+
+class LazyPipelineRegistry(Mapping):
+    """
+    Pipeline adlarını sınıflara eşleyen, sınıfları ilk erişimde yükleyen bir sözlük.
+    `AVAILABLE_PIPELINES.get(name)` gibi mevcut kullanımlarla uyumludur.
+    """
+    def __init__(self):
+        self._entry_points: Dict[str, EntryPoint] = {}
+        self._classes: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def set_entry_points(self, pipeline_eps: Dict[str, EntryPoint]) -> None:
+        with self._lock:
+            self._entry_points = dict(pipeline_eps)
+            self._classes = {name: cls for name, cls in self._classes.items() if name not in self._entry_points}
+
+    def register(self, name: str, pipeline_class: Any) -> None:
+        """Entry point olmadan bir pipeline sınıfını doğrudan kaydeder (benchmark/test için)."""
+        with self._lock:
+            self._classes[name] = pipeline_class
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._classes
+
+    def load_all(self) -> None:
+        for name in list(self._entry_points):
+            self[name]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entry_points.clear()
+            self._classes.clear()
+
+    def __getitem__(self, name: str) -> Any:
+        pipeline_class = self._classes.get(name)
+        if pipeline_class is not None:
+            return pipeline_class
+        with self._lock:
+            if name in self._classes:
+                return self._classes[name]
+            ep = self._entry_points.get(name)
+            if ep is None:
+                raise KeyError(name)
+            logging.info(f"Worker: Loading pipeline plugin '{name}' from '{ep.value}'...")
+            pipeline_class = self._classes[name] = ep.load()
+            return pipeline_class
+
+    def __iter__(self) -> Iterator[str]:
+        return iter({**self._entry_points, **self._classes})
+
+    def __len__(self) -> int:
+        return len({**self._entry_points, **self._classes})
+
+
+pipeline_registry = LazyPipelineRegistry()
+
+
+def _default_manifest_path() -> str:
+    return os.getenv(
+        "PIPELINES_MANIFEST_PATH",
+        os.path.join(os.getenv("CACHE_DIR", ".cache"), "pipelines_manifest.json"),
+    )
+
+
+def _installed_fingerprint(pipeline_eps: Dict[str, EntryPoint], config_eps: Dict[str, EntryPoint]) -> str:
+    """Entry point'ler ve onları sağlayan dağıtımların versiyonlarından bir parmak izi üretir."""
+    parts = set()
+    for group, eps in ((PIPELINES_EP_GROUP, pipeline_eps), (CONFIGS_EP_GROUP, config_eps)):
+        for ep in eps.values():
+            dist = getattr(ep, "dist", None)
+            dist_id = f"{dist.name}=={dist.version}" if dist is not None else "unknown"
+            parts.add(f"{group}|{ep.name}|{ep.value}|{dist_id}")
+    return hashlib.sha1("\n".join(sorted(parts)).encode("utf-8")).hexdigest()
+
+
+def _read_manifest(path: str, fingerprint: str) -> Optional[Dict[str, Dict[str, Any]]]:
+    try:
+        with open(path) as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    if manifest.get("version") != MANIFEST_VERSION or manifest.get("fingerprint") != fingerprint:
+        return None
+    return manifest.get("catalog")
+
+
+def _write_manifest(path: str, fingerprint: str, catalog: Dict[str, Dict[str, Any]]) -> None:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"version": MANIFEST_VERSION, "fingerprint": fingerprint, "catalog": catalog}, f)
+    os.replace(tmp_path, path)
+
+
+def _build_catalog_entry(name: str, pipeline_ep: EntryPoint, config_ep: Optional[EntryPoint]) -> Dict[str, Any]:
+    # Varsayılan konfigürasyonu yükle
+    default_config = config_ep.load()() if config_ep is not None else {}
+
+    # Form şemasını yükle
+    form_schema = {}
+    try:
+        # Paket adını entry point değerinden bul, pipeline sınıfını import etmeden
+        # 'azuraforge_cifar10.pipeline:Cifar10Pipeline' -> 'azuraforge_cifar10'
+        package_name = pipeline_ep.value.split(":")[0].split(".")[0]
+        with resources.open_text(package_name, "form_schema.json") as f:
+            form_schema = json.load(f)
+    except Exception as e:
+        logging.warning(f"Worker: form_schema.json could not be loaded for '{name}': {e}")
+
+    return {"id": name, "default_config": default_config, "form_schema": form_schema}
+
+
+def discover_pipelines(eager: Optional[bool] = None, manifest_path: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Eklentileri keşfeder, `pipeline_registry`'yi günceller ve katalogu döndürür.
+
+    `eager` None ise `AZURAFORGE_PLUGIN_LOADING` ortam değişkenine bakılır
+    ('lazy' varsayılan, 'eager' tüm sınıfları hemen yükler).
+    """
+    if eager is None:
+        eager = os.getenv("AZURAFORGE_PLUGIN_LOADING", "lazy").lower() == "eager"
+    manifest_path = manifest_path or _default_manifest_path()
+
+    pipeline_eps = {ep.name: ep for ep in entry_points(group=PIPELINES_EP_GROUP)}
+    config_eps = {ep.name: ep for ep in entry_points(group=CONFIGS_EP_GROUP)}
+    pipeline_registry.set_entry_points(pipeline_eps)
+
+    fingerprint = _installed_fingerprint(pipeline_eps, config_eps)
+    catalog = _read_manifest(manifest_path, fingerprint)
+    if catalog is not None:
+        logging.info(f"Worker: Pipeline catalog loaded from manifest '{manifest_path}'.")
+    else:
+        logging.info("Worker: Pipeline manifest missing or stale; rebuilding catalog from entry_points...")
+        catalog = {name: _build_catalog_entry(name, ep, config_eps.get(name)) for name, ep in pipeline_eps.items()}
+        try:
+            _write_manifest(manifest_path, fingerprint, catalog)
+        except (OSError, TypeError) as e:
+            logging.warning(f"Worker: Pipeline manifest could not be written to '{manifest_path}': {e}")
+
+    if eager:
+        pipeline_registry.load_all()
+    return catalog
@@ -0,0 +1,98 @@
+# worker/src/azuraforge_worker/prediction_cache.py
+"""
+Bu modül, tahmin yanıtlarını tüm worker'lar arasında paylaşılan bir Redis
+önbelleğinde tutar.
+
+Anahtar; deney ID'si, model artifact'inin mtime değeri, tahmin adım sayısı ve
+veri sürümünden (veri seti parmak izi + yükleme sırasında hesaplanan içerik
+özeti) oluşur. Model yeniden eğitildiğinde veya veri yenilendiğinde anahtar değişir;
+eski girdiler kullanılmaz ve TTL ile kendiliğinden silinir. Böylece aynı
+tahmini isteyen panolar için tekrar eden istekler tek bir Redis GET'e iner.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, Optional
+
+import pandas as pd
+import redis
+
+from .dataset_store import DATASET_VERSION_ATTR
+from .redis_pool import get_redis
+
+DEFAULT_PREDICTION_CACHE_TTL_SECONDS = 3600
+
+
+def data_version(dataset_key: Optional[str], df: pd.DataFrame) -> str:
+    """
+    Veri setinin içeriği değiştiğinde (yeni satır, geçmiş değerleri düzelten yenileme)
+    değişen kısa sürüm etiketi. Yükleme sırasında `df.attrs`'a yazılan içerik özeti
+    kullanılır; yoksa satır sayısı ve son index zamanına düşülür.
+    """
+    content_version = df.attrs.get(DATASET_VERSION_ATTR)
+    if content_version:
+        raw = f"{dataset_key}|{content_version}"
+    else:
+        last_index = df.index[-1] if len(df) else None
+        raw = f"{dataset_key}|{len(df)}|{last_index!r}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def prediction_cache_key(experiment_id: str, model_mtime_ns: Optional[int], prediction_steps: int,
+                         data_version_tag: str, variant: str = "") -> str:
+    """`variant`, aynı tahminin farklı serileştirmelerini (format, geçmiş nokta sayısı) ayırır."""
+    key = f"prediction-result:{experiment_id}:{model_mtime_ns}:{prediction_steps}:{data_version_tag}"
+    return f"{key}:{variant}" if variant else key
+
+
+class PredictionResultCache:
+    """Tahmin yanıtları için Redis üzerinde TTL'li, JSON tabanlı önbellek."""
+
+    def __init__(self, ttl_seconds: int, enabled: bool = True):
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled and ttl_seconds > 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        if not self.enabled:
+            return None
+        try:
+            raw = get_redis().get(key)
+        except redis.RedisError as e:
+            # Önbelleğe erişilemiyorsa tahmin normal yoldan hesaplanır.
+            logging.warning(f"PredictionResultCache: GET failed for '{key}': {e}")
+            with self._lock:
+                self.errors += 1
+            return None
+        with self._lock:
+            if raw is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(raw)
+
+    def put(self, key: str, response: Dict[str, Any]) -> None:
+        if not self.enabled:
+            return
+        try:
+            get_redis().set(key, json.dumps(response), ex=self.ttl_seconds)
+        except (redis.RedisError, TypeError, ValueError) as e:
+            logging.warning(f"PredictionResultCache: SET failed for '{key}': {e}")
+            with self._lock:
+                self.errors += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"enabled": self.enabled, "ttl_seconds": self.ttl_seconds,
+                    "hits": self.hits, "misses": self.misses, "errors": self.errors}
+
+
+prediction_result_cache = PredictionResultCache(
+    ttl_seconds=int(os.getenv("PREDICTION_CACHE_TTL_SECONDS", DEFAULT_PREDICTION_CACHE_TTL_SECONDS)),
+    enabled=os.getenv("PREDICTION_CACHE_ENABLED", "true").lower() in ("1", "true", "yes"),
+)
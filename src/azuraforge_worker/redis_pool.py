@@ -0,0 +1,98 @@
+# worker/src/azuraforge_worker/redis_pool.py
+"""
+Bu modül, worker sürecindeki tüm bileşenlerin (pipeline kataloğu, ilerleme
+callback'leri, önbellekler) paylaştığı tek bir Redis bağlantı havuzu sağlar.
+
+Havuz `worker_process_init` sinyalinde oluşturulur ve `worker_process_shutdown`
+sinyalinde kapatılır. Sinyallerin çalışmadığı durumlarda (ör. ana süreç,
+eager görevler) ilk `get_redis()` çağrısında tembel olarak oluşturulur.
+"""
+import logging
+import os
+import threading
+from typing import Any, Dict, Optional
+
+import redis
+
+DEFAULT_REDIS_POOL_MAX_CONNECTIONS = 16
+DEFAULT_REDIS_POOL_TIMEOUT_SECONDS = 5
+
+
+class InstrumentedBlockingConnectionPool(redis.BlockingConnectionPool):
+    """Havuz boyutlandırması için bağlantı alma ve bekleme sayılarını tutan havuz."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.waits = 0
+
+    def get_connection(self, *args, **kwargs):
+        self.checkouts += 1
+        # Kuyrukta boşta bağlantı (veya yeni bağlantı için yer) yoksa çağrı bekleyecektir.
+        if self.pool.empty():
+            self.waits += 1
+        return super().get_connection(*args, **kwargs)
+
+    def stats(self) -> Dict[str, Any]:
+        created = len(getattr(self, "_connections", []))
+        idle = sum(1 for conn in list(self.pool.queue) if conn is not None)
+        return {
+            "max_connections": self.max_connections,
+            "created": created,
+            "in_use": created - idle,
+            "idle": idle,
+            "checkouts": self.checkouts,
+            "waits": self.waits,
+        }
+
+
+_pool: Optional[InstrumentedBlockingConnectionPool] = None
+_pool_pid: Optional[int] = None
+_lock = threading.Lock()
+
+
+def init_redis_pool(redis_url: Optional[str] = None, **pool_kwargs) -> InstrumentedBlockingConnectionPool:
+    """
+    Mevcut süreç için Redis bağlantı havuzunu oluşturur. `pool_kwargs` içinde
+    `connection_class` verilirse URL yerine bu bağlantı sınıfı kullanılır
+    (ör. benchmark'larda fakeredis).
+    """
+    global _pool, _pool_pid
+    with _lock:
+        if _pool is not None and _pool_pid == os.getpid():
+            return _pool
+        # Fork ile ebeveynden gelen havuzun soketleri ebeveynle paylaşılır; kapatmadan bırakılır.
+        options = {
+            "max_connections": int(os.getenv("REDIS_POOL_MAX_CONNECTIONS", DEFAULT_REDIS_POOL_MAX_CONNECTIONS)),
+            "timeout": float(os.getenv("REDIS_POOL_TIMEOUT_SECONDS", DEFAULT_REDIS_POOL_TIMEOUT_SECONDS)),
+            **pool_kwargs,
+        }
+        if "connection_class" in options:
+            _pool = InstrumentedBlockingConnectionPool(**options)
+        else:
+            redis_url = redis_url or os.environ.get("REDIS_URL", "redis://redis:6379/0")
+            _pool = InstrumentedBlockingConnectionPool.from_url(redis_url, **options)
+        _pool_pid = os.getpid()
+        logging.info(f"WORKER: Redis connection pool initialized for PID: {_pool_pid}")
+        return _pool
+
+
+def get_redis() -> redis.Redis:
+    """Süreç genelindeki havuzu kullanan bir Redis istemcisi döndürür."""
+    pool = _pool if _pool is not None and _pool_pid == os.getpid() else init_redis_pool()
+    return redis.Redis(connection_pool=pool)
+
+
+def close_redis_pool() -> None:
+    global _pool, _pool_pid
+    with _lock:
+        if _pool is not None and _pool_pid == os.getpid():
+            logging.info(f"WORKER: Disconnecting Redis connection pool for PID: {_pool_pid}...")
+            _pool.disconnect()
+        _pool, _pool_pid = None, None
+
+
+def get_redis_pool_stats() -> Dict[str, Any]:
+    if _pool is None or _pool_pid != os.getpid():
+        return {"max_connections": 0, "created": 0, "in_use": 0, "idle": 0, "checkouts": 0, "waits": 0}
+    return _pool.stats()
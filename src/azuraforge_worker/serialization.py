@@ -0,0 +1,48 @@
+# worker/src/azuraforge_worker/serialization.py
+"""
+Bu modül, tahmin yanıtlarındaki zaman serilerini vektörel olarak serileştirir.
+
+- `dict` (varsayılan, geriye dönük uyumlu): `{"2024-01-01T00:00:00": değer, ...}`
+- `columnar`: `{"timestamps_ms": [int, ...], "values": [float, ...]}`
+- `columnar_b64`: `values` yerine little-endian float32 baytlarının base64 hali
+  (`values_b64`, `dtype: "float32"`)
+
+Sütunlu formatlar nokta başına string anahtar üretmez; dönüşüm tamamen NumPy
+ile yapılır ve Celery sonuç deposundaki yanıt boyutu küçülür.
+"""
+import base64
+from typing import Any, Dict
+
+import numpy as np
+import pandas as pd
+
+RESPONSE_FORMAT_DICT = "dict"
+RESPONSE_FORMAT_COLUMNAR = "columnar"
+RESPONSE_FORMAT_COLUMNAR_B64 = "columnar_b64"
+RESPONSE_FORMATS = (RESPONSE_FORMAT_DICT, RESPONSE_FORMAT_COLUMNAR, RESPONSE_FORMAT_COLUMNAR_B64)
+
+
+def normalize_response_format(response_format: Any) -> str:
+    response_format = (response_format or RESPONSE_FORMAT_DICT).lower()
+    if response_format not in RESPONSE_FORMATS:
+        raise ValueError(f"Unsupported response_format '{response_format}'. Expected one of {RESPONSE_FORMATS}.")
+    return response_format
+
+
+def epoch_ms(index: pd.Index) -> np.ndarray:
+    """Index'i UTC epoch milisaniye tamsayı dizisine çevirir."""
+    return pd.to_datetime(index).values.astype("datetime64[ms]").astype(np.int64)
+
+
+def encode_series(series: pd.Series, response_format: str) -> Dict[str, Any]:
+    if response_format == RESPONSE_FORMAT_DICT:
+        return series.set_axis(pd.to_datetime(series.index).strftime('%Y-%m-%dT%H:%M:%S')).to_dict()
+
+    encoded: Dict[str, Any] = {"timestamps_ms": epoch_ms(series.index).tolist()}
+    if response_format == RESPONSE_FORMAT_COLUMNAR_B64:
+        values = np.ascontiguousarray(series.to_numpy(dtype=np.float32), dtype="<f4")
+        encoded["values_b64"] = base64.b64encode(values.tobytes()).decode("ascii")
+        encoded["dtype"] = "float32"
+    else:
+        encoded["values"] = series.to_numpy(dtype=np.float64).tolist()
+    return encoded
@@ -2,35 +2,124 @@ import logging
 import os
 import traceback
 import json
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from importlib.metadata import entry_points
-from importlib import resources
-from contextlib import contextmanager
+from contextlib import contextmanager, nullcontext
 from typing import Optional, Dict, Any, Tuple, List
 import pandas as pd
 import numpy as np
-import redis
-from functools import lru_cache
 
 from ..celery_app import celery_app
 from ..database import get_db_session
 from azuraforge_dbmodels import Experiment
-from ..callbacks import RedisProgressCallback
+from ..callbacks import RedisProgressCallback, CheckpointCallback, CancellationCallback
+from ..cancellation import TrainingCancelled, parse_early_stopping
+from ..checkpoints import (is_checkpointing_enabled, read_latest_checkpoint, clear_checkpoints, promote_checkpoint_model,
+                           record_training_attempt, max_training_attempts, TrainingAttemptsExceeded)
+from ..data_cache import shared_data_cache, make_dataset_key, interprocess_lock, estimate_nbytes
+from ..model_cache import CachedPredictor, predictor_cache
+from ..model_artifact import save_model_artifacts, load_model_artifact
+from ..prediction_cache import prediction_result_cache, prediction_cache_key, data_version
+from ..serialization import RESPONSE_FORMAT_DICT, normalize_response_format, encode_series
+from ..dataset_store import (SharedDatasetStore, shared_dataset_store, is_shared_dataset_store_enabled,
+                             DATASET_VERSION_ATTR, CREATED_AT_ATTR, content_fingerprint)
+from ..data_refresh import supports_incremental_refresh, needs_full_refresh, append_new_rows, write_refresh_state
+from ..plugins import discover_pipelines, pipeline_registry
+from ..redis_pool import get_redis, get_redis_pool_stats
+from ..metrics import start_task_metrics, metrics_registry
+from ..memory_governor import memory_governor
+from ..thread_budget import task_thread_limits, current_thread_budget
 from azuraforge_learner import TimeSeriesPipeline, Learner, BasePipeline # BasePipeline import edildi
 
 REDIS_PIPELINES_KEY = "azuraforge:pipelines_catalog"
-AVAILABLE_PIPELINES: Dict[str, Any] = {}
+AVAILABLE_PIPELINES = pipeline_registry
 REPORTS_BASE_DIR = os.path.abspath(os.getenv("REPORTS_DIR", "/app/reports"))
+# Artımlı güncelleme için süresi dolmuş disk önbelleğini de okuyabilmek adına kullanılan üst sınır.
+STALE_CACHE_MAX_AGE_HOURS = 24 * 365 * 100
 
-@lru_cache(maxsize=16)
-def get_shared_data(pipeline_name: str, full_config_json: str) -> pd.DataFrame:
+def _load_shared_data(pipeline_instance: BasePipeline, pipeline_name: str, dataset_key: str) -> pd.DataFrame:
     from azuraforge_learner.caching import get_cache_filepath, load_from_cache, save_to_cache
+
+    caching_params = pipeline_instance.get_caching_params()
+    cache_dir = os.getenv("CACHE_DIR", ".cache")
+    cache_filepath = get_cache_filepath(cache_dir, pipeline_name, caching_params)
+    system_config = pipeline_instance.config.get("system", {})
+    cache_max_age = system_config.get("cache_max_age_hours", 24)
+    caching_enabled = system_config.get("caching_enabled", False)
+    # Önbelleği kapatan pipeline'ların verisi diske yazılmaz ve diskten okunmaz.
+    use_store = caching_enabled and is_shared_dataset_store_enabled()
+
+    # Disk önbelleği veya paylaşımlı depo etkinse, aynı veri setini isteyen diğer çocuk
+    # süreçler ilk indirme bitene kadar bekler ve ardından diskten okur.
+    with interprocess_lock(cache_dir, dataset_key) if (caching_enabled or use_store) else nullcontext():
+        # Diğer süreçlerin yayınladığı bellek eşlemeli kopya varsa onu kullan
+        if use_store:
+            stored_data = shared_dataset_store.load(dataset_key, max_age_seconds=cache_max_age * 3600)
+            if stored_data is not None:
+                logging.info(f"Paylaşımlı veri seti deposundan eşlendi: {dataset_key}")
+                return stored_data
+
+        source_data = None
+        # Önbellek etkinse ve geçerliyse cache'ten yükle
+        if caching_enabled:
+            source_data = load_from_cache(cache_filepath, cache_max_age)
+            if source_data is not None:
+                logging.info(f"Paylaşımlı önbellek için veri diskten yüklendi: {cache_filepath}")
+
+        if source_data is None and supports_incremental_refresh(pipeline_instance) \
+                and not needs_full_refresh(pipeline_instance, cache_dir, dataset_key):
+            # Süresi dolmuş kopyayı atmak yerine yalnızca son zaman damgasından sonraki satırları çek
+            stale_data = shared_dataset_store.load(dataset_key) if use_store else None
+            if stale_data is None and caching_enabled:
+                stale_data = load_from_cache(cache_filepath, STALE_CACHE_MAX_AGE_HOURS)
+            if stale_data is not None:
+                try:
+                    source_data = append_new_rows(pipeline_instance, stale_data)
+                except Exception as e:
+                    logging.warning(f"Artımlı güncelleme başarısız oldu, tam yüklemeye geçiliyor: {e}", exc_info=True)
+            if source_data is not None and caching_enabled and not source_data.empty:
+                save_to_cache(source_data, cache_filepath)
+
+        if source_data is None:
+            logging.info(f"Paylaşımlı önbellek için veri kaynaktan indiriliyor. Parametreler: {caching_params}")
+            source_data = pipeline_instance._load_data_from_source()
+            if supports_incremental_refresh(pipeline_instance):
+                write_refresh_state(cache_dir, dataset_key, last_full_refresh=time.time())
+
+            # Önbelleğe kaydetme (sadece pandas DataFrame ise)
+            if caching_enabled and isinstance(source_data, pd.DataFrame) and not source_data.empty:
+                save_to_cache(source_data, cache_filepath)
+
+        if use_store and SharedDatasetStore.is_storable(source_data):
+            try:
+                return shared_dataset_store.publish(dataset_key, source_data)
+            except Exception as e:
+                logging.warning(f"Veri seti paylaşımlı depoya yazılamadı, süreç içi kopya kullanılacak: {e}")
+
+    if isinstance(source_data, pd.DataFrame):
+        # Artımlı güncellemede eski kopyanın özeti ve yayın zamanı taşınmış olabilir; yeni veri şimdi oluştu.
+        source_data.attrs[DATASET_VERSION_ATTR] = content_fingerprint(source_data)
+        source_data.attrs.pop(CREATED_AT_ATTR, None)
+    return source_data
+
+def get_shared_data(pipeline_name: str, full_config: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Pipeline'ın ham verisini, veri seti parmak izine göre süreç içi önbellekten döndürür.
+    Aynı veri seti için eşzamanlı gelen istekler tek bir yüklemede birleştirilir.
+
+    Süreç içi önbellek her zaman kullanılır; `system.caching_enabled` yalnızca disk önbelleğini
+    ve paylaşımlı veri seti deposunu açar (bkz. `_load_shared_data`).
+
+    Önbellekteki DataFrame'in kendisi değil, yüzeysel (shallow) bir kopyası döndürülür:
+    sütun ekleme/silme veya `dropna(inplace=True)` gibi işlemler diğer görevleri etkilemez.
+    Değerlerin yerinde değiştirilmesi (ör. `df.iloc[0, 0] = x`) ise paylaşılan veriyi
+    değiştirir; pipeline'lar ham veriyi salt-okunur kabul etmelidir.
+    """
     pipeline_class = AVAILABLE_PIPELINES.get(pipeline_name)
     if not pipeline_class: raise ValueError(f"Paylaşımlı veri yüklenirken pipeline '{pipeline_name}' bulunamadı.")
-    
-    # Geçici pipeline örneği oluştururken, tam konfigürasyonu aktarın.
-    full_config = json.loads(full_config_json)
-    
+
     # Eğer pipeline'ın bir get_config_model'ı varsa ve Pydantic ile doğrulama yapıyorsa
     # burada oluşabilecek hataları yakalamak için try-except ekleyebiliriz.
     try:
@@ -39,64 +128,23 @@ def get_shared_data(pipeline_name: str, full_config_json: str) -> pd.DataFrame:
         logging.error(f"Error instantiating pipeline '{pipeline_name}' for shared data loading: {e}", exc_info=True)
         raise ValueError(f"Pipeline '{pipeline_name}' could not be initialized with provided config.") from e
 
-    caching_params = temp_pipeline_instance.get_caching_params()
-    cache_dir = os.getenv("CACHE_DIR", ".cache")
-    cache_filepath = get_cache_filepath(cache_dir, pipeline_name, caching_params)
-    system_config = temp_pipeline_instance.config.get("system", {}); 
-    cache_max_age = system_config.get("cache_max_age_hours", 24)
-    
-    # Önbellek etkinse ve geçerliyse cache'ten yükle
-    if system_config.get("caching_enabled", False):
-        cached_data = load_from_cache(cache_filepath, cache_max_age)
-        if cached_data is not None: 
-            logging.info(f"Paylaşımlı önbellek için veri diskten yüklendi: {cache_filepath}")
-            return cached_data
-
-    logging.info(f"Paylaşımlı önbellek için veri kaynaktan indiriliyor. Parametreler: {caching_params}")
-    source_data = temp_pipeline_instance._load_data_from_source()
-    
-    # Önbelleğe kaydetme (sadece pandas DataFrame ise)
-    if system_config.get("caching_enabled", False) and isinstance(source_data, pd.DataFrame) and not source_data.empty: 
-        save_to_cache(source_data, cache_filepath)
-        
-    return source_data
+    dataset_key = make_dataset_key(pipeline_name, temp_pipeline_instance.get_caching_params())
+    cache_max_age = temp_pipeline_instance.config.get("system", {}).get("cache_max_age_hours", 24)
+    data = shared_data_cache.get_or_load(
+        dataset_key,
+        lambda: _load_shared_data(temp_pipeline_instance, pipeline_name, dataset_key),
+        max_age_seconds=cache_max_age * 3600,
+    )
+    return data.copy(deep=False) if isinstance(data, pd.DataFrame) else data
 
 def discover_and_register_pipelines():
-    global AVAILABLE_PIPELINES; logging.info("Worker: Discovering and registering pipelines via entry_points...")
+    logging.info("Worker: Discovering and registering pipelines via entry_points...")
     try:
-        pipeline_eps = entry_points(group='azuraforge.pipelines')
-        config_eps = entry_points(group='azuraforge.configs') # config entry_points'i de alıyoruz
-        
-        pipeline_class_map = {ep.name: ep.load() for ep in pipeline_eps}
-        config_func_map = {ep.name: ep.load() for ep in config_eps}
-        
-        catalog_to_register = {}
-        for name, p_class in pipeline_class_map.items():
-            # Varsayılan konfigürasyonu yükle
-            default_config = {}
-            if name in config_func_map:
-                default_config = config_func_map[name]()
-            
-            # Form şemasını yükle
-            form_schema = {}
-            try:
-                # Modül yolunu doğru şekilde bul
-                # 'azuraforge_cifar10.pipeline:Cifar10Pipeline' -> 'azuraforge_cifar10'
-                package_name = p_class.__module__.split('.')[0] 
-                with resources.open_text(package_name, "form_schema.json") as f: 
-                    form_schema = json.load(f)
-            except Exception as e: 
-                logging.warning(f"Worker: form_schema.json could not be loaded for '{name}': {e}")
-            
-            catalog_to_register[name] = json.dumps({
-                "id": name, 
-                "default_config": default_config, 
-                "form_schema": form_schema
-            })
-            
-        AVAILABLE_PIPELINES = pipeline_class_map
+        # Pipeline sınıfları burada import edilmez; ilk görev geldiğinde yüklenir.
+        catalog = discover_pipelines()
+        catalog_to_register = {name: json.dumps(entry) for name, entry in catalog.items()}
         if catalog_to_register: 
-            r = redis.from_url(os.environ.get("REDIS_URL", "redis://redis:6379/0"))
+            r = get_redis()
             r.delete(REDIS_PIPELINES_KEY)
             r.hset(REDIS_PIPELINES_KEY, mapping=catalog_to_register)
             logging.info(f"Worker: {len(catalog_to_register)} pipelines registered.")
@@ -107,6 +155,16 @@ def discover_and_register_pipelines():
 discover_and_register_pipelines()
 os.makedirs(REPORTS_BASE_DIR, exist_ok=True)
 
+metrics_registry.register_gauge_provider("shared_data_cache", shared_data_cache.stats)
+metrics_registry.register_gauge_provider("predictor_cache", predictor_cache.stats)
+metrics_registry.register_gauge_provider("redis_pool", get_redis_pool_stats)
+metrics_registry.register_gauge_provider("prediction_result_cache", prediction_result_cache.stats)
+metrics_registry.register_gauge_provider("memory_governor", memory_governor.stats)
+
+# Yumuşak bellek sınırı aşıldığında önce en büyük tüketici olan veri setleri boşaltılır.
+memory_governor.register_shedder("shared_data_cache", shared_data_cache.clear)
+memory_governor.register_shedder("predictor_cache", predictor_cache.clear)
+
 @contextmanager
 def get_db(): yield from get_db_session()
 
@@ -127,6 +185,45 @@ def _prepare_and_log_initial_state(task_id: str, user_config: Dict[str, Any]) ->
     logging.info(f"Experiment {experiment_id} logged to DB with status STARTED.")
     return experiment_id, full_config
 
+def _find_resumable_experiment(task_id: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """Görev yeniden teslim edildiyse, aynı task_id ile başlamış ve bitmemiş deneyi döndürür."""
+    with get_db() as db:
+        exp = db.query(Experiment).filter_by(task_id=task_id, status="STARTED").first()
+        if exp:
+            return exp.id, exp.config
+    return None
+
+def _resume_run_config(full_config: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+    """
+    En son checkpoint'i bulur ve kalan epoch sayısıyla çalıştırılacak konfigürasyonu döndürür.
+    Veritabanındaki konfigürasyon değişmez; yalnızca bu çalıştırmanın epoch sayısı azaltılır.
+    """
+    checkpoint = read_latest_checkpoint(full_config['experiment_dir'])
+    if not checkpoint:
+        return full_config, None
+    training_params = full_config.get('training_params', {})
+    total_epochs = int(training_params.get('epochs', checkpoint['epoch']))
+    remaining_epochs = total_epochs - int(checkpoint['epoch'])
+    if remaining_epochs <= 0:
+        # Checkpoint son epoch'ta alınmış; eğitim tekrar çalıştırılmaz, yalnızca model kaydedilir.
+        logging.info(f"Experiment {full_config['experiment_id']} already reached epoch {checkpoint['epoch']}; completing from checkpoint.")
+        return full_config, {**checkpoint, "training_complete": True}
+    logging.info(f"Resuming experiment {full_config['experiment_id']} from epoch {checkpoint['epoch']}; {remaining_epochs} epochs remaining.")
+    return {**full_config, 'training_params': {**training_params, 'epochs': remaining_epochs}}, checkpoint
+
+def _complete_from_checkpoint(experiment_id: str, full_config: Dict[str, Any], checkpoint: Dict[str, Any],
+                              metrics: Any) -> Dict[str, Any]:
+    """Son epoch checkpoint'inin modelini nihai artifact yapar ve deneyi tamamlar."""
+    with metrics.phase("save_model"):
+        model_path = promote_checkpoint_model(checkpoint, full_config['experiment_dir'])
+    results = {"resumed_from_epoch": int(checkpoint['epoch']), "completed_from_checkpoint": True,
+               "last_progress": checkpoint.get("last_progress")}
+    with metrics.phase("db_complete"):
+        _update_experiment_on_completion(experiment_id, results, model_path)
+    clear_checkpoints(full_config['experiment_dir'])
+    metrics.finish("SUCCESS")
+    return {"experiment_id": experiment_id, "status": "SUCCESS", "model_path": model_path}
+
 def _update_experiment_on_completion(experiment_id, results, model_path):
     with get_db() as db: 
         exp = db.query(Experiment).filter_by(id=experiment_id).first()
@@ -137,6 +234,8 @@ def _update_experiment_on_completion(experiment_id, results, model_path):
             exp.completed_at = datetime.now(datetime.utcnow().tzinfo)
             db.commit()
             logging.info(f"Experiment {experiment_id} updated to SUCCESS.")
+            # Yeniden eğitilen deneyin bu süreçteki eski predictor'ı kullanılmamalı
+            predictor_cache.invalidate(experiment_id)
         else:
             logging.warning(f"Experiment {experiment_id} not found for completion update.")
 
@@ -157,145 +256,538 @@ def _update_experiment_on_failure(experiment_id, error):
             logging.error(f"CRITICAL: Experiment {experiment_id} not found for failure update. Error: {error_message}", exc_info=True)
 
 
-@celery_app.task(bind=True, name="start_training_pipeline")
+def _save_trained_model(pipeline_instance: BasePipeline, pipeline_name: str, experiment_dir: str) -> Optional[str]:
+    # Birincil artifact ikili formattadır (best_model.bin); format yoldan anlaşılır.
+    if hasattr(pipeline_instance.learner, 'save_model'):
+        return save_model_artifacts(pipeline_instance.learner, experiment_dir)
+    logging.warning(f"Pipeline '{pipeline_name}' learner does not have save_model method.")
+    return None # Model kaydedilemediyse path'i null yap
+
+
+# acks_late + reject_on_worker_lost: çocuk süreç eğitim ortasında ölürse mesaj kuyruğa geri
+# döner ve görev, aynı task_id ile en son checkpoint'ten devam eder.
+@celery_app.task(bind=True, name="start_training_pipeline", acks_late=True, reject_on_worker_lost=True)
 def start_training_pipeline(self, user_config: Dict[str, Any]):
     experiment_id = None
+    metrics = start_task_metrics("start_training_pipeline")
     try:
-        experiment_id, full_config = _prepare_and_log_initial_state(self.request.id, user_config)
+        with metrics.phase("db_prepare"):
+            attempt = record_training_attempt(self.request.id)
+            resumable = _find_resumable_experiment(self.request.id)
+            if resumable:
+                experiment_id, full_config = resumable
+                logging.info(f"Task {self.request.id} was redelivered (attempt {attempt}); continuing experiment {experiment_id}.")
+                # Her denemede öldürülen (ör. OOM) görevler sonsuza kadar yeniden kuyruğa girmemeli.
+                if attempt > max_training_attempts():
+                    clear_checkpoints(full_config['experiment_dir'])
+                    raise TrainingAttemptsExceeded(
+                        f"Task {self.request.id} was delivered {attempt} times without completing "
+                        f"(limit: {max_training_attempts()}); the worker running it was probably killed each time."
+                    )
+            else:
+                experiment_id, full_config = _prepare_and_log_initial_state(self.request.id, user_config)
+        run_config, checkpoint = _resume_run_config(full_config) if resumable else (full_config, None)
+        if checkpoint and checkpoint.get("training_complete"):
+            return _complete_from_checkpoint(experiment_id, full_config, checkpoint, metrics)
         pipeline_name = full_config['pipeline_name']
-        PipelineClass = AVAILABLE_PIPELINES.get(pipeline_name)
-        if not PipelineClass:
-            raise ValueError(f"Pipeline '{pipeline_name}' is not registered.")
-        
-        # Pipeline örneğini oluştururken tam konfigürasyonu gönder
-        pipeline_instance: BasePipeline = PipelineClass(full_config)
+        with metrics.phase("pipeline_init"):
+            PipelineClass = AVAILABLE_PIPELINES.get(pipeline_name)
+            if not PipelineClass:
+                raise ValueError(f"Pipeline '{pipeline_name}' is not registered.")
+            
+            # Pipeline örneğini oluştururken tam konfigürasyonu gönder
+            pipeline_instance: BasePipeline = PipelineClass(run_config)
         
         run_kwargs = {}
         # Eğer zaman serisi pipeline ise, raw_data'yı shared cache'ten yükle
         if isinstance(pipeline_instance, TimeSeriesPipeline):
-            run_kwargs['raw_data'] = get_shared_data(pipeline_name, json.dumps(full_config, sort_keys=True))
+            cache_hits_before = shared_data_cache.hits
+            with metrics.phase("load_data"):
+                run_kwargs['raw_data'] = get_shared_data(pipeline_name, full_config)
+            if metrics.enabled:
+                metrics.incr("data_cache_hits", shared_data_cache.hits - cache_hits_before)
+                metrics.incr("data_bytes", estimate_nbytes(run_kwargs['raw_data']))
             
-        results = pipeline_instance.run(callbacks=[RedisProgressCallback(task_id=self.request.id)], **run_kwargs)
+        epoch_offset = int(checkpoint['epoch']) if checkpoint else 0
+        progress_callback = RedisProgressCallback(task_id=self.request.id, epoch_offset=epoch_offset)
+        # Aynı batch_id'yi paylaşan ayrı görevler de tek bir tarama olarak iptal edilir ve erken durdurulur.
+        batch_id = full_config.get('batch_id')
+        cancellation_callback = CancellationCallback(
+            [self.request.id, experiment_id, batch_id],
+            sweep_id=batch_id, member_id=experiment_id,
+            early_stopping=parse_early_stopping(full_config), epoch_offset=epoch_offset,
+        )
+        callbacks = [progress_callback]
+        if is_checkpointing_enabled():
+            callbacks.append(CheckpointCallback(full_config['experiment_dir'], pipeline_instance, resume_from=checkpoint))
+        callbacks.append(cancellation_callback)
+        try:
+            with metrics.phase("train"), task_thread_limits(full_config):
+                results = pipeline_instance.run(callbacks=callbacks, **run_kwargs)
+                # Seyreltme nedeniyle henüz yayınlanmamış son epoch varsa tam olarak gönder
+                progress_callback.close()
+        except TrainingCancelled as cancelled:
+            # Çocuk süreç öldürülmez; kısmi sonuç kaydedilir ve slot hemen serbest kalır.
+            progress_callback.close()
+            outcome = _cancelled_outcome(experiment_id, pipeline_instance, pipeline_name, full_config['experiment_dir'],
+                                         cancelled, cancellation_callback.last_payload)
+            with metrics.phase("db_complete"):
+                _bulk_update_experiments([outcome])
+            metrics.finish("CANCELLED")
+            return {"experiment_id": experiment_id, "status": "CANCELLED", "reason": cancelled.reason,
+                    "model_path": outcome["model_path"]}
+        if metrics.enabled:
+            metrics.incr("epochs", progress_callback.epochs_seen)
+            metrics.incr("progress_bytes", progress_callback.published_bytes)
+            train_seconds = metrics.phases.get("train", 0.0)
+            if train_seconds > 0:
+                metrics.set("epochs_per_second", progress_callback.epochs_seen / train_seconds)
         
         # Modeli kaydet
-        model_path = os.path.join(full_config['experiment_dir'], "best_model.json")
-        if hasattr(pipeline_instance.learner, 'save_model'):
-            pipeline_instance.learner.save_model(model_path)
-        else:
-            logging.warning(f"Pipeline '{pipeline_name}' learner does not have save_model method.")
-            model_path = None # Model kaydedilemediyse path'i null yap
+        with metrics.phase("save_model"):
+            model_path = _save_trained_model(pipeline_instance, pipeline_name, full_config['experiment_dir'])
 
-        _update_experiment_on_completion(experiment_id, results, model_path)
+        if metrics.enabled and isinstance(results, dict):
+            results = {**results, "timings": metrics.as_dict()}
+        if checkpoint and isinstance(results, dict):
+            results = {**results, "resumed_from_epoch": epoch_offset}
+        with metrics.phase("db_complete"):
+            _update_experiment_on_completion(experiment_id, results, model_path)
+        clear_checkpoints(full_config['experiment_dir'])
+        metrics.finish("SUCCESS")
         return {"experiment_id": experiment_id, "status": "SUCCESS", "model_path": model_path}
     except Exception as e:
         if experiment_id: _update_experiment_on_failure(experiment_id, e)
         else: logging.error(f"CRITICAL: Could not log failure for task {self.request.id}. Error: {e}", exc_info=True)
+        metrics.finish("FAILURE")
         raise e
 
 
-@celery_app.task(name="predict_from_model_task")
-def predict_from_model_task(experiment_id: str, request_data: Optional[List[Dict[str, Any]]] = None, prediction_steps: Optional[int] = 1) -> Dict[str, Any]:
+def _prepare_batch_initial_state(task_id: str, user_configs: List[Dict[str, Any]]) -> List[Tuple[str, Dict[str, Any]]]:
+    """Bir taramadaki tüm deneyleri tek bir commit ile STARTED olarak kaydeder."""
+    run_timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    prepared, rows = [], []
+    for index, user_config in enumerate(user_configs):
+        pipeline_name = user_config.get("pipeline_name")
+        experiment_id = f"{pipeline_name}_{run_timestamp}_{task_id[:8]}_{index:03d}"
+        # Her konfigürasyonun ilerlemesi kendi kanalında yayınlanır.
+        progress_task_id = f"{task_id}-{index}"
+        full_config = {**user_config, 
+                       'experiment_id': experiment_id, 
+                       'task_id': progress_task_id, 
+                       'batch_task_id': task_id, 
+                       'experiment_dir': os.path.join(REPORTS_BASE_DIR, pipeline_name, experiment_id), 
+                       'start_time': datetime.now().isoformat()}
+        os.makedirs(full_config['experiment_dir'], exist_ok=True)
+        prepared.append((experiment_id, full_config))
+        rows.append(Experiment(id=experiment_id, task_id=progress_task_id, pipeline_name=pipeline_name, status="STARTED", config=full_config, batch_id=user_config.get('batch_id'), batch_name=user_config.get('batch_name')))
+
     with get_db() as db:
+        db.add_all(rows)
+        db.commit()
+    logging.info(f"Batch {task_id}: {len(rows)} experiments logged to DB with status STARTED.")
+    return prepared
+
+def _train_batch_member(experiment_id: str, full_config: Dict[str, Any],
+                        num_threads: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Taramadaki tek bir konfigürasyonu eğitir. Veritabanına yazmaz; sonuç, toplu
+    güncelleme için çağırana döndürülür. Ayrı bir süreçte de çalıştırılabilir.
+    `num_threads`, konfigürasyon `system.num_threads` vermiyorsa kullanılacak thread sayısıdır.
+    """
+    try:
+        pipeline_name = full_config['pipeline_name']
+        PipelineClass = AVAILABLE_PIPELINES.get(pipeline_name)
+        if not PipelineClass:
+            raise ValueError(f"Pipeline '{pipeline_name}' is not registered.")
+        pipeline_instance: BasePipeline = PipelineClass(full_config)
+
+        run_kwargs = {}
+        if isinstance(pipeline_instance, TimeSeriesPipeline):
+            run_kwargs['raw_data'] = get_shared_data(pipeline_name, full_config)
+
+        progress_callback = RedisProgressCallback(task_id=full_config['task_id'])
+        batch_task_id = full_config.get('batch_task_id')
+        # batch_id, ayrı görevlerle gönderilen üyelerle aynı taramayı (iptal + erken durdurma) paylaşır.
+        batch_id = full_config.get('batch_id')
+        cancellation_callback = CancellationCallback(
+            [full_config['task_id'], batch_task_id, batch_id, experiment_id],
+            sweep_id=batch_id or batch_task_id, member_id=experiment_id,
+            early_stopping=parse_early_stopping(full_config),
+        )
         try:
-            exp = db.query(Experiment).filter(Experiment.id == experiment_id).first()
-            if not exp: raise ValueError(f"Experiment with ID '{experiment_id}' not found.")
-            if not exp.model_path or not os.path.exists(exp.model_path): raise FileNotFoundError(f"No model artifact for experiment '{experiment_id}'.")
+            with task_thread_limits(full_config, default_num_threads=num_threads):
+                results = pipeline_instance.run(callbacks=[progress_callback, cancellation_callback], **run_kwargs)
+        except TrainingCancelled as cancelled:
+            progress_callback.close()
+            return _cancelled_outcome(experiment_id, pipeline_instance, pipeline_name, full_config['experiment_dir'],
+                                      cancelled, cancellation_callback.last_payload)
+        progress_callback.close()
 
-            PipelineClass = AVAILABLE_PIPELINES.get(exp.pipeline_name)
-            if not PipelineClass: raise ValueError(f"Pipeline '{exp.pipeline_name}' is not registered.")
-            
-            # Tahmin için pipeline örneğini tam konfigürasyon ile oluştur
-            pipeline_instance: BasePipeline = PipelineClass(exp.config)
-            
-            is_timeseries = isinstance(pipeline_instance, TimeSeriesPipeline)
-
-            # Modeli yüklemeden önce scaler'ları eğit
-            # Eğer zaman serisi ise, tarihsel veriyi al ve scaler'ları eğit
-            if is_timeseries:
-                full_config_json = json.dumps(exp.config, sort_keys=True)
-                historical_data_df = get_shared_data(exp.pipeline_name, full_config_json)
-                
-                # Scaler'ları eğit
-                pipeline_instance._fit_scalers(historical_data_df)
-
-                # Tahmin için kullanılacak son N veriyi al
-                seq_len = exp.config.get('model_params', {}).get('sequence_length', 60)
-                # İstemciden gelen `request_data` varsa, bunu kullan
-                if request_data:
-                    # request_data'yı DataFrame'e çevir
-                    input_df = pd.DataFrame(request_data)
-                    # Eğer zaman sütunu varsa onu index yap
-                    if 'time' in input_df.columns:
-                        input_df['time'] = pd.to_datetime(input_df['time'])
-                        input_df.set_index('time', inplace=True)
-                    # Önemli: Input data sadece modelin feature_cols'larını içermelidir
-                    # ve scaler'a uygun formda olmalıdır.
-                    # Ancak şu anki tasarımda PredictionModal request.data göndermiyor.
-                    # Bu durumda, her zaman `historical_data_df`'in son `seq_len`'ini kullanırız.
-                    current_prediction_input_df = historical_data_df.tail(seq_len)
-                else:
-                    # Request data yoksa, genel tarihsel verinin sonunu kullan
-                    if len(historical_data_df) < seq_len:
-                        raise ValueError(f"Not enough historical data ({len(historical_data_df)}) for sequence of {seq_len}.")
-                    current_prediction_input_df = historical_data_df.tail(seq_len)
-            else:
-                # Zaman serisi olmayan modeller için varsayılan model input şekli
-                # (ör: görüntü için (N, C, H, W))
-                model_input_shape = (1, 3, 32, 32) 
-            
-            # Modeli yükle
-            # model_input_shape TimeSeriesPipeline dışındaki diğer pipeline'lar için gerekli.
-            # TimeSeriesPipeline için ise bu değer _create_model içinde zaten input_shape olarak kullanılıyor.
-            model_input_shape_for_create = exp.config.get('model_params', {}).get('input_shape', None)
-            if not model_input_shape_for_create and is_timeseries:
-                 # X_train'in shape'ini tahmin etmeye çalış (batch_size, seq_len, num_features)
-                 num_features = len(pipeline_instance.feature_cols) if pipeline_instance.feature_cols else 1
-                 model_input_shape_for_create = (1, seq_len, num_features)
-            elif not model_input_shape_for_create and not is_timeseries:
-                 # Görüntü sınıflandırma gibi durumlar için varsayılan
-                 model_input_shape_for_create = (1, 3, 32, 32) # CIFAR-10 için örnek
-
-            model = pipeline_instance._create_model(model_input_shape_for_create)
-            learner = Learner(model=model)
-            learner.load_model(exp.model_path)
-
-            if is_timeseries:
-                # Çok adımlı tahmin yap
-                forecasted_df = pipeline_instance.forecast(
-                    initial_df=current_prediction_input_df, 
-                    learner=learner, 
-                    num_steps=prediction_steps
-                )
-                
-                # İlk tahmin edilen değer (PredictionModal'daki .predictionValue için)
-                prediction_value = float(forecasted_df.iloc[0][forecasted_df.columns[0]]) if not forecasted_df.empty else None
-                
-                # Geçmiş veriyi string anahtarlı sözlüğe dönüştür
-                actual_history_series = historical_data_df[pipeline_instance.target_col].tail(seq_len)
-                actual_history_series.index = pd.to_datetime(actual_history_series.index).strftime('%Y-%m-%dT%H:%M:%S')
-                string_keyed_actual_history = actual_history_series.to_dict()
-
-                # Tahmin edilen seriyi string anahtarlı sözlüğe dönüştür
-                forecasted_series_string_keyed = {}
-                if not forecasted_df.empty:
-                    # forecasted_df'in index'ini datetime nesnesine çevirip string yap
-                    forecasted_df.index = pd.to_datetime(forecasted_df.index).strftime('%Y-%m-%dT%H:%M:%S')
-                    forecasted_series_string_keyed = forecasted_df[forecasted_df.columns[0]].to_dict() # İlk sütunu al
-
-                return {
-                    "prediction": prediction_value, 
-                    "experiment_id": experiment_id,
-                    "target_col": pipeline_instance.target_col,
-                    "actual_history": string_keyed_actual_history,
-                    "forecasted_series": forecasted_series_string_keyed
-                }
+        model_path = _save_trained_model(pipeline_instance, pipeline_name, full_config['experiment_dir'])
+        return {"experiment_id": experiment_id, "status": "SUCCESS", "results": results, "model_path": model_path}
+    except Exception as e:
+        return _batch_failure_outcome(experiment_id, e)
+
+def _cancelled_outcome(experiment_id: str, pipeline_instance: BasePipeline, pipeline_name: str, experiment_dir: str,
+                       cancelled: TrainingCancelled, last_payload: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """İptal edilen eğitimin o ana kadarki modelini ve son ilerleme verisini kısmi sonuç olarak hazırlar."""
+    logging.info(f"Experiment {experiment_id} cancelled: {cancelled}")
+    model_path = None
+    try:
+        model_path = _save_trained_model(pipeline_instance, pipeline_name, experiment_dir)
+    except Exception as e:
+        logging.warning(f"Partial model for cancelled experiment {experiment_id} could not be saved: {e}")
+    clear_checkpoints(experiment_dir)
+    results = {"cancelled": True, "reason": cancelled.reason, "message": str(cancelled),
+               "stopped_at_epoch": cancelled.epoch, "last_progress": last_payload}
+    return {"experiment_id": experiment_id, "status": "CANCELLED", "results": results, "model_path": model_path}
+
+def _batch_failure_outcome(experiment_id: str, error: Exception) -> Dict[str, Any]:
+    logging.error(f"Batch member {experiment_id} failed: {error}", exc_info=True)
+    return {"experiment_id": experiment_id, "status": "FAILURE",
+            "error": {"error_code": getattr(error, 'error_code', "PIPELINE_EXECUTION_ERROR"),
+                      "message": str(error), "traceback": traceback.format_exc()}}
+
+def _run_batch_members(prepared: List[Tuple[str, Dict[str, Any]]], max_workers: int) -> List[Dict[str, Any]]:
+    if max_workers > 1 and len(prepared) > 1:
+        pool_size = min(max_workers, len(prepared))
+        # Worker çocuğunun thread bütçesi alt süreçler arasında bölünür; aksi halde
+        # her üye bütçenin tamamını kullanır ve çekirdekler yeniden aşırı yüklenir.
+        member_threads = max(1, current_thread_budget() // pool_size)
+        try:
+            # fork ile açılan alt süreçler, önceden yüklenmiş veri setini ve eklentileri
+            # yazma anında kopyalama (copy-on-write) ile devralır.
+            with ProcessPoolExecutor(max_workers=pool_size,
+                                     mp_context=multiprocessing.get_context("fork")) as executor:
+                futures = [executor.submit(_train_batch_member, eid, cfg, member_threads) for eid, cfg in prepared]
+                outcomes = []
+                for (experiment_id, _), future in zip(prepared, futures):
+                    try:
+                        outcomes.append(future.result())
+                    except Exception as e:
+                        # Ör. alt süreç OOM ile öldüyse veya sonuç pickle edilemediyse
+                        outcomes.append(_batch_failure_outcome(experiment_id, e))
+                return outcomes
+        except (AssertionError, OSError) as e:
+            # Ör. daemon süreçlerin alt süreç açmasına izin verilmeyen havuzlar
+            logging.warning(f"Batch training could not use a process pool ({e}); training sequentially.")
+    return [_train_batch_member(eid, cfg) for eid, cfg in prepared]
+
+def _bulk_update_experiments(outcomes: List[Dict[str, Any]]) -> None:
+    """Tüm tarama sonuçlarını tek bir sorgu ve tek bir commit ile yazar."""
+    by_id = {outcome["experiment_id"]: outcome for outcome in outcomes}
+    now = datetime.now(datetime.utcnow().tzinfo)
+    with get_db() as db:
+        for exp in db.query(Experiment).filter(Experiment.id.in_(list(by_id))).all():
+            outcome = by_id[exp.id]
+            exp.status = outcome["status"]
+            if outcome["status"] in ("SUCCESS", "CANCELLED"):
+                exp.results = outcome["results"]
+                exp.model_path = outcome["model_path"]
+                exp.completed_at = now
             else:
-                # Zaman serisi olmayan modeller için tahmin (Örn: Sınıflandırma, Üretim)
-                # Bu kısım henüz tam olarak implemente edilmediği için hata fırlatabiliriz.
-                # Gelecekte, request_data kullanılarak uygun formatta tahmin yapılacaktır.
-                raise NotImplementedError("Prediction for non-time-series models is not yet fully implemented for general purpose.")
-            
+                exp.error = outcome["error"]
+                exp.failed_at = now
+        db.commit()
+    for experiment_id in by_id:
+        predictor_cache.invalidate(experiment_id)
+
+
+@celery_app.task(bind=True, name="start_training_batch")
+def start_training_batch(self, user_configs: List[Dict[str, Any]], max_workers: Optional[int] = None):
+    """
+    Aynı `batch_id`'yi paylaşan bir hiperparametre taramasını tek görevde eğitir.
+
+    Veri seti bir kez yüklenir ve tüm konfigürasyonlarla paylaşılır; deney kayıtları
+    toplu olarak yazılır. `max_workers` > 1 ise konfigürasyonlar fork edilen yerel
+    bir süreç havuzunda paralel eğitilir (varsayılan: `BATCH_TRAINING_MAX_WORKERS`).
+    """
+    if max_workers is None:
+        max_workers = int(os.getenv("BATCH_TRAINING_MAX_WORKERS", 1))
+    prepared = _prepare_batch_initial_state(self.request.id, user_configs)
+
+    # Veri setini fork/eğitim öncesinde bir kez yükle; aynı parmak izine sahip
+    # konfigürasyonlar süreç içi önbellekten aynı nesneyi alır.
+    for experiment_id, full_config in prepared:
+        try:
+            PipelineClass = AVAILABLE_PIPELINES.get(full_config['pipeline_name'])
+            if PipelineClass and issubclass(PipelineClass, TimeSeriesPipeline):
+                get_shared_data(full_config['pipeline_name'], full_config)
+        except Exception as e:
+            # Hata, ilgili konfigürasyonun eğitimi sırasında tekrar oluşup kaydedilecek.
+            logging.warning(f"Batch {self.request.id}: data preload failed for {experiment_id}: {e}")
+
+    outcomes = _run_batch_members(prepared, max_workers)
+    _bulk_update_experiments(outcomes)
+
+    succeeded = sum(1 for outcome in outcomes if outcome["status"] == "SUCCESS")
+    cancelled = sum(1 for outcome in outcomes if outcome["status"] == "CANCELLED")
+    logging.info(f"Batch {self.request.id} finished: {succeeded}/{len(outcomes)} experiments succeeded, {cancelled} cancelled or early-stopped.")
+    return {
+        "batch_id": user_configs[0].get('batch_id') if user_configs else None,
+        # Erken durdurulan konfigürasyonlar bir hata sayılmaz.
+        "status": "SUCCESS" if succeeded + cancelled == len(outcomes) else "PARTIAL_FAILURE",
+        "experiments": [{"experiment_id": o["experiment_id"], "status": o["status"], "model_path": o.get("model_path")} for o in outcomes],
+    }
+
+
+def _fetch_experiment_record(experiment_id: str) -> Dict[str, Any]:
+    with get_db() as db:
+        exp = db.query(Experiment).filter(Experiment.id == experiment_id).first()
+        if not exp: raise ValueError(f"Experiment with ID '{experiment_id}' not found.")
+        return {"pipeline_name": exp.pipeline_name, "config": exp.config, "model_path": exp.model_path}
+
+def _fetch_experiment_records(experiment_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Birden fazla deneyin kaydını tek bir sorguyla getirir."""
+    if not experiment_ids:
+        return {}
+    with get_db() as db:
+        rows = db.query(Experiment).filter(Experiment.id.in_(experiment_ids)).all()
+        return {exp.id: {"pipeline_name": exp.pipeline_name, "config": exp.config, "model_path": exp.model_path} for exp in rows}
+
+def _build_predictor(experiment_id: str, record: Optional[Dict[str, Any]] = None) -> CachedPredictor:
+    """Deneyin pipeline'ını kurar, scaler'larını eğitir ve modelini yükler."""
+    if record is None:
+        record = _fetch_experiment_record(experiment_id)
+    pipeline_name, config, model_path = record["pipeline_name"], record["config"], record["model_path"]
+    if not model_path or not os.path.exists(model_path): raise FileNotFoundError(f"No model artifact for experiment '{experiment_id}'.")
+
+    PipelineClass = AVAILABLE_PIPELINES.get(pipeline_name)
+    if not PipelineClass: raise ValueError(f"Pipeline '{pipeline_name}' is not registered.")
+
+    # Tahmin için pipeline örneğini tam konfigürasyon ile oluştur
+    pipeline_instance: BasePipeline = PipelineClass(config)
+    is_timeseries = isinstance(pipeline_instance, TimeSeriesPipeline)
+    seq_len = config.get('model_params', {}).get('sequence_length', 60)
+    dataset_key = make_dataset_key(pipeline_name, pipeline_instance.get_caching_params()) if is_timeseries else None
+
+    # Modeli yüklemeden önce scaler'ları eğit
+    # Eğer zaman serisi ise, tarihsel veriyi al ve scaler'ları eğit
+    if is_timeseries:
+        historical_data_df = get_shared_data(pipeline_name, config)
+        pipeline_instance._fit_scalers(historical_data_df)
+
+    # Modeli yükle
+    # model_input_shape TimeSeriesPipeline dışındaki diğer pipeline'lar için gerekli.
+    # TimeSeriesPipeline için ise bu değer _create_model içinde zaten input_shape olarak kullanılıyor.
+    model_input_shape_for_create = config.get('model_params', {}).get('input_shape', None)
+    if not model_input_shape_for_create and is_timeseries:
+         # X_train'in shape'ini tahmin etmeye çalış (batch_size, seq_len, num_features)
+         num_features = len(pipeline_instance.feature_cols) if pipeline_instance.feature_cols else 1
+         model_input_shape_for_create = (1, seq_len, num_features)
+    elif not model_input_shape_for_create and not is_timeseries:
+         # Görüntü sınıflandırma gibi durumlar için varsayılan
+         model_input_shape_for_create = (1, 3, 32, 32) # CIFAR-10 için örnek
+
+    model = pipeline_instance._create_model(model_input_shape_for_create)
+    learner = Learner(model=model)
+    model_format = load_model_artifact(learner, model_path)
+    logging.info(f"Predictor for experiment {experiment_id} built and cached ({model_format} model artifact).")
+
+    return CachedPredictor(
+        experiment_id=experiment_id, pipeline_name=pipeline_name, config=config,
+        model_path=model_path, pipeline_instance=pipeline_instance, learner=learner,
+        is_timeseries=is_timeseries, seq_len=seq_len, dataset_key=dataset_key,
+    )
+
+def _ensure_timeseries_predictor(predictor: CachedPredictor) -> None:
+    if not predictor.is_timeseries:
+        # Zaman serisi olmayan modeller için tahmin (Örn: Sınıflandırma, Üretim)
+        # Bu kısım henüz tam olarak implemente edilmediği için hata fırlatabiliriz.
+        # Gelecekte, request_data kullanılarak uygun formatta tahmin yapılacaktır.
+        raise NotImplementedError("Prediction for non-time-series models is not yet fully implemented for general purpose.")
+
+def _forecast(predictor: CachedPredictor, historical_data_df: pd.DataFrame, prediction_steps: int) -> pd.DataFrame:
+    """Tarihsel verinin son `seq_len` satırından başlayarak çok adımlı tahmin yapar."""
+    seq_len = predictor.seq_len
+    if len(historical_data_df) < seq_len:
+        raise ValueError(f"Not enough historical data ({len(historical_data_df)}) for sequence of {seq_len}.")
+    current_prediction_input_df = historical_data_df.tail(seq_len)
+    with predictor.lock:
+        return predictor.pipeline_instance.forecast(
+            initial_df=current_prediction_input_df, 
+            learner=predictor.learner, 
+            num_steps=prediction_steps
+        )
+
+def _build_forecast_response(experiment_id: str, predictor: CachedPredictor,
+                             historical_data_df: pd.DataFrame, forecasted_df: pd.DataFrame,
+                             response_format: str = RESPONSE_FORMAT_DICT,
+                             history_points: Optional[int] = None) -> Dict[str, Any]:
+    target_col = predictor.pipeline_instance.target_col
+
+    # İlk tahmin edilen değer (PredictionModal'daki .predictionValue için)
+    prediction_value = float(forecasted_df.iloc[0][forecasted_df.columns[0]]) if not forecasted_df.empty else None
+    
+    # Varsayılan olarak modelin girdi penceresi kadar geçmiş veri döndürülür.
+    history_points = predictor.seq_len if history_points is None else history_points
+    actual_history_series = historical_data_df[target_col].tail(history_points) if history_points > 0 else historical_data_df[target_col].iloc[:0]
+
+    # Tahmin edilen seri (ilk sütun)
+    forecasted_series = forecasted_df[forecasted_df.columns[0]] if not forecasted_df.empty else pd.Series(dtype=np.float64)
+
+    response = {
+        "prediction": prediction_value, 
+        "experiment_id": experiment_id,
+        "target_col": target_col,
+        "actual_history": encode_series(actual_history_series, response_format),
+        "forecasted_series": encode_series(forecasted_series, response_format),
+    }
+    if response_format != RESPONSE_FORMAT_DICT:
+        response["format"] = response_format
+    return response
+
+
+@celery_app.task(name="predict_from_model_task")
+def predict_from_model_task(experiment_id: str, request_data: Optional[List[Dict[str, Any]]] = None, prediction_steps: Optional[int] = 1,
+                            response_format: Optional[str] = None, history_points: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Deneyin modeliyle çok adımlı tahmin yapar.
+
+    `response_format`: 'dict' (varsayılan), 'columnar' veya 'columnar_b64' (bkz. serialization.py).
+    `history_points`: `actual_history` içinde döndürülecek son nokta sayısı (varsayılan: sequence_length).
+    """
+    metrics = start_task_metrics("predict_from_model_task")
+    try:
+        response_format = normalize_response_format(response_format)
+        # Pipeline, scaler'lar ve Learner sıcak önbellekten gelir; model dosyası değiştiyse yeniden kurulur.
+        predictor_hits_before = predictor_cache.hits
+        with metrics.phase("predictor"):
+            predictor = predictor_cache.get_or_build(experiment_id, lambda: _build_predictor(experiment_id))
+        _ensure_timeseries_predictor(predictor)
+        cache_hits_before = shared_data_cache.hits
+        with metrics.phase("load_data"):
+            historical_data_df = get_shared_data(predictor.pipeline_name, predictor.config)
+        if metrics.enabled:
+            metrics.incr("predictor_cache_hits", predictor_cache.hits - predictor_hits_before)
+            metrics.incr("data_cache_hits", shared_data_cache.hits - cache_hits_before)
+
+        # Model veya veri değişmediyse aynı yanıt başka bir istek için zaten hesaplanmış olabilir.
+        result_key = prediction_cache_key(experiment_id, predictor.model_mtime_ns, prediction_steps,
+                                          data_version(predictor.dataset_key, historical_data_df),
+                                          variant=f"{response_format}:{history_points}")
+        with metrics.phase("result_cache"):
+            cached_response = prediction_result_cache.get(result_key)
+        if cached_response is not None:
+            metrics.incr("result_cache_hits")
+            metrics.finish("SUCCESS")
+            return cached_response
+
+        # Not: PredictionModal şu an request_data göndermiyor; gönderilse bile input,
+        # modelin feature_cols'larını içermediği sürece scaler'a uygun olmaz. Bu yüzden
+        # her zaman `historical_data_df`'in son `seq_len`'ini kullanırız.
+        with metrics.phase("forecast"):
+            forecasted_df = _forecast(predictor, historical_data_df, prediction_steps)
+        with metrics.phase("serialize"):
+            response = _build_forecast_response(experiment_id, predictor, historical_data_df, forecasted_df,
+                                                response_format=response_format, history_points=history_points)
+            prediction_result_cache.put(result_key, response)
+        metrics.finish("SUCCESS")
+        return response
+        
+    except Exception as e:
+        metrics.finish("FAILURE")
+        logging.error(f"Prediction task failed for experiment {experiment_id}: {e}", exc_info=True)
+        # Hata kodu ekleyerek frontend'in daha anlamlı mesaj göstermesini sağla
+        raise ValueError(f"PREDICTION_TASK_FAILED: {str(e)}")
+
+
+def _normalize_batch_request(item: Any) -> Tuple[str, int]:
+    if isinstance(item, dict):
+        return item["experiment_id"], int(item.get("prediction_steps") or 1)
+    experiment_id, prediction_steps = item
+    return experiment_id, int(prediction_steps or 1)
+
+@celery_app.task(name="predict_batch_task")
+def predict_batch_task(requests: List[Any], response_format: Optional[str] = None,
+                       history_points: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Birden fazla deney için tahminleri tek görevde üretir.
+
+    `requests`, `(experiment_id, prediction_steps)` çiftlerinden (veya aynı anahtarlara
+    sahip sözlüklerden) oluşan bir listedir. Sonuçlar aynı sırayla döndürülür; hatalar
+    yalnızca ilgili girdiyi etkiler. `response_format` ve `history_points` tüm
+    yanıtlara uygulanır (bkz. `predict_from_model_task`).
+    """
+    response_format = normalize_response_format(response_format)
+    normalized = [_normalize_batch_request(item) for item in requests]
+    results: List[Optional[Dict[str, Any]]] = [None] * len(normalized)
+
+    # Aynı deney için gelen istekler, en uzun ufukla tek bir tahminde birleştirilir.
+    steps_by_experiment: Dict[str, int] = {}
+    for experiment_id, prediction_steps in normalized:
+        steps_by_experiment[experiment_id] = max(prediction_steps, steps_by_experiment.get(experiment_id, 0))
+
+    # Önbellekte olmayan deneylerin kayıtları tek sorguyla alınır.
+    predictors: Dict[str, CachedPredictor] = {}
+    errors: Dict[str, str] = {}
+    missing_ids = [eid for eid in steps_by_experiment if predictor_cache.peek(eid) is None]
+    records = _fetch_experiment_records(missing_ids)
+    for experiment_id in steps_by_experiment:
+        try:
+            if experiment_id in missing_ids and experiment_id not in records:
+                raise ValueError(f"Experiment with ID '{experiment_id}' not found.")
+            record = records.get(experiment_id)
+            predictor = predictor_cache.get_or_build(experiment_id, lambda eid=experiment_id, rec=record: _build_predictor(eid, rec))
+            _ensure_timeseries_predictor(predictor)
+            predictors[experiment_id] = predictor
+        except Exception as e:
+            logging.error(f"Batch prediction setup failed for experiment {experiment_id}: {e}", exc_info=True)
+            errors[experiment_id] = str(e)
+
+    # Tarihsel veri, veri seti parmak izi başına bir kez yüklenir.
+    groups: Dict[str, List[str]] = {}
+    for experiment_id, predictor in predictors.items():
+        groups.setdefault(predictor.dataset_key, []).append(experiment_id)
+
+    forecasts: Dict[str, Tuple[CachedPredictor, pd.DataFrame, pd.DataFrame]] = {}
+    result_keys: Dict[Tuple[str, int], str] = {}
+    cached_responses: Dict[Tuple[str, int], Dict[str, Any]] = {}
+    for dataset_key, experiment_ids in groups.items():
+        first = predictors[experiment_ids[0]]
+        try:
+            historical_data_df = get_shared_data(first.pipeline_name, first.config)
         except Exception as e:
-            logging.error(f"Prediction task failed for experiment {experiment_id}: {e}", exc_info=True)
-            # Hata kodu ekleyerek frontend'in daha anlamlı mesaj göstermesini sağla
-            raise ValueError(f"PREDICTION_TASK_FAILED: {str(e)}")
\ No newline at end of file
+            logging.error(f"Batch prediction could not load data for '{dataset_key}': {e}", exc_info=True)
+            errors.update({eid: str(e) for eid in experiment_ids})
+            continue
+        version = data_version(dataset_key, historical_data_df)
+        for experiment_id in experiment_ids:
+            predictor = predictors[experiment_id]
+            # Bu deney için istenen tüm ufuklar önbellekteyse tahmin hiç hesaplanmaz.
+            requested_steps = {steps for eid, steps in normalized if eid == experiment_id}
+            for steps in requested_steps:
+                key = prediction_cache_key(experiment_id, predictor.model_mtime_ns, steps, version,
+                                           variant=f"{response_format}:{history_points}")
+                result_keys[(experiment_id, steps)] = key
+                cached = prediction_result_cache.get(key)
+                if cached is not None:
+                    cached_responses[(experiment_id, steps)] = cached
+            if all((experiment_id, steps) in cached_responses for steps in requested_steps):
+                continue
+            try:
+                forecasted_df = _forecast(predictor, historical_data_df, steps_by_experiment[experiment_id])
+                forecasts[experiment_id] = (predictor, historical_data_df, forecasted_df)
+            except Exception as e:
+                logging.error(f"Batch prediction failed for experiment {experiment_id}: {e}", exc_info=True)
+                errors[experiment_id] = str(e)
+
+    for i, (experiment_id, prediction_steps) in enumerate(normalized):
+        if experiment_id in errors:
+            results[i] = {"experiment_id": experiment_id, "prediction_steps": prediction_steps,
+                          "status": "FAILURE", "error": f"PREDICTION_TASK_FAILED: {errors[experiment_id]}"}
+            continue
+        response = cached_responses.get((experiment_id, prediction_steps))
+        if response is None:
+            predictor, historical_data_df, forecasted_df = forecasts[experiment_id]
+            response = _build_forecast_response(experiment_id, predictor, historical_data_df, forecasted_df.head(prediction_steps),
+                                                response_format=response_format, history_points=history_points)
+            cached_responses[(experiment_id, prediction_steps)] = response
+            prediction_result_cache.put(result_keys[(experiment_id, prediction_steps)], response)
+        results[i] = {"experiment_id": experiment_id, "prediction_steps": prediction_steps,
+                      "status": "SUCCESS", "result": response}
+
+    logging.info(f"Batch prediction finished: {len(normalized)} requests, {len(forecasts)} forecasts, "
+                 f"{len(groups)} dataset groups, {len(errors)} failures.")
+    return {"results": results}
\ No newline at end of file
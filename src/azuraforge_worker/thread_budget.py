@@ -0,0 +1,156 @@
+# worker/src/azuraforge_worker/thread_budget.py
+"""
+Bu modül, prefork çocuk süreçlerinin BLAS/OpenMP/PyTorch thread sayılarını
+worker concurrency değerine göre sınırlar.
+
+Her çocuk kendi NumPy/PyTorch'u ile çekirdek başına bir thread açarsa, çok
+çekirdekli makinelerde binlerce çalışmaya hazır thread birbirini ezer. Burada her
+çocuğa `kullanılabilir çekirdek / concurrency` kadar thread bütçesi verilir ve
+istenirse çocuklar ayrık çekirdek kümelerine sabitlenir (CPU affinity).
+"""
+import logging
+import os
+import sys
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional
+
+try:
+    from threadpoolctl import threadpool_limits
+except ImportError:  # threadpoolctl opsiyoneldir; yoksa yalnızca ortam değişkenleri kullanılır.
+    threadpool_limits = None
+
+THREAD_ENV_VARS = (
+    "OMP_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+)
+_BLAS_ENV_VARS = ("MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS", "VECLIB_MAXIMUM_THREADS")
+# Worker'ın kendisinin atadığı (operatörün vermediği) değişkenlerin listesi; fork ile çocuklara geçer.
+_EXPORTED_MARKER = "AZURAFORGE_EXPORTED_THREAD_VARS"
+
+
+def available_cpus() -> List[int]:
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def compute_thread_budget(concurrency: int, cpu_count: Optional[int] = None) -> int:
+    """Çocuk süreç başına thread bütçesini hesaplar (`AZURAFORGE_THREADS_PER_CHILD` ile ezilebilir)."""
+    if override := os.getenv("AZURAFORGE_THREADS_PER_CHILD"):
+        return max(1, int(override))
+    cpu_count = cpu_count or len(available_cpus())
+    return max(1, cpu_count // max(1, concurrency))
+
+
+def current_thread_budget() -> int:
+    """Bu sürecin (worker çocuğunun) thread bütçesi; concurrency `worker_init` ile kaydedilir."""
+    return compute_thread_budget(int(os.getenv("AZURAFORGE_CONCURRENCY") or 1))
+
+
+def export_thread_env(budget: int) -> None:
+    """
+    Kütüphaneler import edilmeden önce (ana süreçte) thread ortam değişkenlerini ayarlar.
+    Operatörün açıkça verdiği değerler korunur.
+    """
+    exported = set(filter(None, os.environ.get(_EXPORTED_MARKER, "").split(",")))
+    for name in THREAD_ENV_VARS:
+        if name not in os.environ:
+            os.environ[name] = str(budget)
+            exported.add(name)
+    os.environ[_EXPORTED_MARKER] = ",".join(sorted(exported))
+
+
+def explicit_thread_env() -> Dict[str, int]:
+    """Operatörün açıkça verdiği (worker'ın atamadığı) thread değişkenlerini döndürür."""
+    exported = set(os.environ.get(_EXPORTED_MARKER, "").split(","))
+    explicit = {}
+    for name in THREAD_ENV_VARS:
+        value = os.environ.get(name)
+        if value and name not in exported:
+            try:
+                explicit[name] = max(1, int(value))
+            except ValueError:
+                continue
+    return explicit
+
+
+def _set_torch_threads(num_threads: int) -> Optional[int]:
+    # PyTorch yalnızca zaten import edilmişse ayarlanır; ayarlamak için import maliyeti ödenmez.
+    torch = sys.modules.get("torch")
+    if torch is None:
+        return None
+    previous = torch.get_num_threads()
+    torch.set_num_threads(num_threads)
+    return previous
+
+
+def apply_thread_budget(budget: int) -> None:
+    """
+    Çocuk süreçte, zaten yüklenmiş BLAS/OpenMP havuzlarını ve PyTorch'u sınırlar.
+    Operatörün açıkça verdiği değişkenler (ör. `OMP_NUM_THREADS=1`) ana süreçte
+    olduğu gibi burada da korunur ve ilgili havuzun sınırı olarak kullanılır.
+    """
+    explicit = explicit_thread_env()
+    for name in THREAD_ENV_VARS:
+        if name not in explicit:
+            os.environ[name] = str(budget)
+    openmp_threads = explicit.get("OMP_NUM_THREADS", budget)
+    blas_threads = next((explicit[name] for name in _BLAS_ENV_VARS if name in explicit), budget)
+    if threadpool_limits is not None:
+        threadpool_limits(limits=openmp_threads, user_api="openmp")
+        threadpool_limits(limits=blas_threads, user_api="blas")
+    _set_torch_threads(openmp_threads)
+    logging.info(f"WORKER: Thread budget for PID {os.getpid()} set to {budget} "
+                 f"(openmp={openmp_threads}, blas={blas_threads}).")
+
+
+def pin_child_affinity(child_index: int, budget: int) -> Optional[List[int]]:
+    """Çocuk süreci, indeksine göre ayrık bir çekirdek kümesine sabitler."""
+    if not hasattr(os, "sched_setaffinity"):
+        return None
+    cpus = available_cpus()
+    start = (child_index * budget) % len(cpus)
+    assigned = [cpus[(start + offset) % len(cpus)] for offset in range(min(budget, len(cpus)))]
+    os.sched_setaffinity(0, assigned)
+    logging.info(f"WORKER: PID {os.getpid()} (child {child_index}) pinned to CPUs {assigned}.")
+    return assigned
+
+
+def is_cpu_pinning_enabled() -> bool:
+    return os.getenv("AZURAFORGE_PIN_CPUS", "false").lower() in ("1", "true", "yes")
+
+
+@contextmanager
+def task_thread_limits(config: Dict[str, Any], default_num_threads: Optional[int] = None):
+    """
+    Pipeline konfigürasyonundaki `system.num_threads` ve `system.cpu_affinity`
+    değerlerini görev süresince uygular ve sonrasında eski hallerine döndürür.
+    `system.num_threads` verilmemişse `default_num_threads` kullanılır.
+    """
+    system_config = config.get("system", {}) or {}
+    num_threads: Optional[int] = system_config.get("num_threads") or default_num_threads
+    cpu_affinity: Optional[Iterable[int]] = system_config.get("cpu_affinity")
+
+    previous_affinity = None
+    if cpu_affinity and hasattr(os, "sched_setaffinity"):
+        previous_affinity = os.sched_getaffinity(0)
+        os.sched_setaffinity(0, set(cpu_affinity))
+
+    previous_torch_threads = None
+    limiter = None
+    if num_threads:
+        if threadpool_limits is not None:
+            limiter = threadpool_limits(limits=int(num_threads))
+        previous_torch_threads = _set_torch_threads(int(num_threads))
+    try:
+        yield
+    finally:
+        if limiter is not None:
+            limiter.restore_original_limits()
+        if previous_torch_threads is not None:
+            _set_torch_threads(previous_torch_threads)
+        if previous_affinity is not None:
+            os.sched_setaffinity(0, previous_affinity)
@@ -0,0 +1,32 @@
+# worker/tests/test_bench_tasks.py
+import argparse
+import os
+import sys
+from unittest import mock
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("pandas")
+pytest.importorskip("celery")
+pytest.importorskip("fakeredis")
+pytest.importorskip("azuraforge_learner")
+pytest.importorskip("azuraforge_dbmodels")
+
+BENCH_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks")
+
+
+def test_benchmark_runs_end_to_end(tmp_path):
+    """Benchmark'ın tamamını (SQLite, fakeredis, sentetik pipeline) küçük boyutlarla çalıştırır."""
+    sys.path.insert(0, BENCH_DIR)
+    import bench_tasks
+
+    args = argparse.Namespace(train_runs=1, predict_runs=2, cached_predict_runs=2, prediction_steps=2,
+                              epochs=1, rows=300, redis_url="", output_dir=str(tmp_path))
+    with mock.patch.dict(os.environ):
+        report = bench_tasks.run(args)
+
+    assert report["training"]["runs"] == 1
+    assert report["training"]["epochs"] >= 1
+    assert report["prediction"]["p50_seconds"] > 0
+    assert report["prediction_cached"]["result_cache"]["hits"] >= 1
@@ -0,0 +1,58 @@
+# worker/tests/test_checkpoints.py
+import json
+import os
+from types import SimpleNamespace
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("pandas")
+pytest.importorskip("celery")
+
+from azuraforge_worker.checkpoints import promote_checkpoint_model, read_latest_checkpoint, save_checkpoint
+from azuraforge_worker.model_artifact import BINARY_MODEL_FILENAME, JSON_MODEL_FILENAME, load_binary_model
+
+
+class _Learner:
+    """Checkpoint'lerin kullandığı kadarıyla learner: `model.parameters()` ve `save_model`."""
+
+    def __init__(self, seed: int):
+        rng = np.random.default_rng(seed)
+        self.params = [SimpleNamespace(data=rng.normal(size=(3, 2)).astype(np.float32)),
+                       SimpleNamespace(data=rng.normal(size=(2,)).astype(np.float32))]
+        self.model = SimpleNamespace(parameters=lambda: self.params)
+
+    def save_model(self, path: str) -> None:
+        with open(path, "w") as f:
+            json.dump([p.data.tolist() for p in self.params], f)
+
+
+@pytest.mark.parametrize("write_json", [False, True])
+def test_final_checkpoint_is_promoted_like_a_completed_model(tmp_path, monkeypatch, write_json):
+    monkeypatch.setenv("MODEL_ARTIFACT_WRITE_JSON", "true" if write_json else "false")
+    learner = _Learner(seed=0)
+    save_checkpoint(learner, str(tmp_path), epoch=5, total_epochs=5, progress={"loss": 0.5, "history": [1, 2]},
+                    final=True)
+
+    checkpoint = read_latest_checkpoint(str(tmp_path))
+    assert checkpoint["epoch"] == 5
+    assert checkpoint["last_progress"] == {"loss": 0.5}
+
+    model_path = promote_checkpoint_model(checkpoint, str(tmp_path))
+    assert model_path == os.path.join(str(tmp_path), BINARY_MODEL_FILENAME)
+    restored = _Learner(seed=1)
+    load_binary_model(restored, model_path)
+    for original, loaded in zip(learner.params, restored.params):
+        np.testing.assert_array_equal(np.asarray(loaded.data), original.data)
+    assert os.path.exists(os.path.join(str(tmp_path), JSON_MODEL_FILENAME)) == write_json
+
+
+def test_intermediate_checkpoint_skips_json_and_keeps_only_latest(tmp_path, monkeypatch):
+    monkeypatch.setenv("MODEL_ARTIFACT_WRITE_JSON", "true")
+    learner = _Learner(seed=0)
+    save_checkpoint(learner, str(tmp_path), epoch=1, total_epochs=5)
+    latest = save_checkpoint(learner, str(tmp_path), epoch=2, total_epochs=5)
+
+    assert read_latest_checkpoint(str(tmp_path))["path"] == latest
+    assert sorted(os.listdir(os.path.dirname(latest))) == [os.path.basename(latest)]
+    assert not os.path.exists(os.path.join(latest, "model.json"))
@@ -0,0 +1,96 @@
+# worker/tests/test_data_cache.py
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("pandas")
+pytest.importorskip("celery")
+
+from azuraforge_worker.data_cache import ByteLRUCache
+
+
+def test_get_or_load_coalesces_concurrent_loads():
+    cache = ByteLRUCache(max_bytes=1024, name="test")
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        started.set()
+        release.wait(timeout=5)
+        return "value"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(cache.get_or_load("k", loader)))
+    leader.start()
+    assert started.wait(timeout=5)
+    followers = [threading.Thread(target=lambda: results.append(cache.get_or_load("k", loader))) for _ in range(4)]
+    for t in followers:
+        t.start()
+    # Takipçiler lider yüklemeyi bitirene kadar bekler; yükleyici yalnızca bir kez çağrılır.
+    deadline = time.monotonic() + 5
+    while cache.coalesced < len(followers) and time.monotonic() < deadline:
+        time.sleep(0.001)
+    release.set()
+    for t in [leader, *followers]:
+        t.join(timeout=5)
+
+    assert results == ["value"] * 5
+    assert len(calls) == 1
+    assert cache.loads == 1
+    assert cache.coalesced == 4
+
+
+def test_get_or_load_propagates_errors_and_allows_retry():
+    cache = ByteLRUCache(max_bytes=1024, name="test")
+
+    def failing_loader():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        cache.get_or_load("k", failing_loader)
+    assert cache.load_failures == 1
+    assert cache.get("k") is None
+    assert cache.get_or_load("k", lambda: "ok") == "ok"
+
+
+def test_evicts_least_recently_used_by_bytes():
+    cache = ByteLRUCache(max_bytes=100, name="test")
+    cache.put("a", "A", nbytes=40)
+    cache.put("b", "B", nbytes=40)
+    assert cache.get("a") == "A"  # "b" artık en eski kullanılan
+    cache.put("c", "C", nbytes=40)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "A"
+    assert cache.get("c") == "C"
+    assert cache.evictions == 1
+    assert cache.stats()["current_bytes"] == 80
+
+
+def test_max_entries_and_oversized_values():
+    cache = ByteLRUCache(max_bytes=100, name="test", max_entries=2)
+    cache.put("a", 1, nbytes=1)
+    cache.put("b", 2, nbytes=1)
+    cache.put("c", 3, nbytes=1)
+    assert cache.get("a") is None
+    assert cache.stats()["entries"] == 2
+
+    cache.put("big", "x", nbytes=101)
+    assert cache.get("big") is None
+    assert cache.get("c") == 3
+
+
+def test_entry_age_starts_at_dataset_publish_time():
+    pd = pytest.importorskip("pandas")
+    from azuraforge_worker.dataset_store import CREATED_AT_ATTR
+
+    cache = ByteLRUCache(max_bytes=1024 ** 2, name="test")
+    df = pd.DataFrame({"a": [1, 2]})
+    df.attrs[CREATED_AT_ATTR] = time.time() - 3600
+    cache.put("old", df)
+
+    assert cache.get("old", max_age_seconds=7200) is not None
+    assert cache.get("old", max_age_seconds=1800) is None
@@ -0,0 +1,92 @@
+# worker/tests/test_dataset_store.py
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+pytest.importorskip("celery")
+
+from azuraforge_worker.dataset_store import (DATASET_VERSION_ATTR, RESIDENT_NBYTES_ATTR,
+                                             SharedDatasetStore)
+
+
+def _sample_frame(index: "pd.Index") -> "pd.DataFrame":
+    n = len(index)
+    df = pd.DataFrame({
+        "close": np.linspace(1.0, 2.0, n),
+        "volume": np.arange(n, dtype=np.int32),
+        "flag": np.arange(n) % 2 == 0,
+        "label": [f"r{i}" for i in range(n)],
+    }, index=index)
+    # Metin sütunları depoda pickle'lanan object dizileri olarak saklanır.
+    df["label"] = df["label"].astype(object)
+    return df
+
+
+def _assert_frame_matches(result: "pd.DataFrame", expected: "pd.DataFrame") -> None:
+    # Eşlenmiş sütunlar np.memmap olduğundan assert_frame_equal'ın sınıf kontrolü yerine
+    # değerler düz dizilere çevrilip karşılaştırılır.
+    pd.testing.assert_index_equal(result.index, expected.index)
+    assert list(result.columns) == list(expected.columns)
+    for name in expected.columns:
+        assert result[name].dtype == expected[name].dtype, name
+        np.testing.assert_array_equal(np.asarray(result[name]), np.asarray(expected[name]))
+
+
+@pytest.mark.parametrize("tz", [None, "Europe/Istanbul"])
+def test_publish_and_load_round_trip_datetime_index(tmp_path, tz):
+    store = SharedDatasetStore(str(tmp_path))
+    df = _sample_frame(pd.date_range("2024-01-01", periods=5, freq="h", tz=tz, name="ts"))
+
+    published = store.publish("stock:abc", df)
+    loaded = store.load("stock:abc")
+
+    for result in (published, loaded):
+        _assert_frame_matches(result, df)
+        assert str(result.index.tz) == str(df.index.tz)
+        assert result.attrs[DATASET_VERSION_ATTR]
+    assert loaded.attrs[RESIDENT_NBYTES_ATTR] == loaded["label"].to_numpy().nbytes
+
+
+@pytest.mark.parametrize("unit", ["s", "ms", "us"])
+@pytest.mark.parametrize("tz", [None, "UTC"])
+def test_round_trip_preserves_non_nanosecond_index(tmp_path, unit, tz):
+    index = pd.date_range("2024-01-01", periods=4, freq="D", tz=tz, name="ts")
+    if not hasattr(index, "as_unit"):
+        pytest.skip("pandas < 2 has only nanosecond datetime indexes")
+    df = _sample_frame(index.as_unit(unit))
+
+    store = SharedDatasetStore(str(tmp_path))
+    store.publish("weather", df)
+    loaded = store.load("weather")
+
+    assert loaded.index.dtype == df.index.dtype
+    _assert_frame_matches(loaded, df)
+
+
+def test_round_trip_plain_index_and_version_tracks_content(tmp_path):
+    store = SharedDatasetStore(str(tmp_path))
+    df = _sample_frame(pd.Index([10, 20, 30], name="id"))
+    first = store.publish("plain", df)
+    _assert_frame_matches(first, df)
+
+    corrected = df.copy()
+    corrected.loc[20, "close"] = 99.0
+    second = store.publish("plain", corrected)
+
+    assert store.load("plain")["close"].tolist() == corrected["close"].tolist()
+    assert first.attrs[DATASET_VERSION_ATTR] != second.attrs[DATASET_VERSION_ATTR]
+
+
+def test_load_missing_or_expired(tmp_path):
+    store = SharedDatasetStore(str(tmp_path))
+    assert store.load("missing") is None
+    store.publish("k", _sample_frame(pd.Index([1, 2], name="id")))
+    assert store.load("k", max_age_seconds=-1) is None
+
+
+def test_is_storable():
+    assert SharedDatasetStore.is_storable(_sample_frame(pd.Index([1], name="id")))
+    assert not SharedDatasetStore.is_storable(pd.DataFrame())
+    assert not SharedDatasetStore.is_storable(pd.DataFrame([[1, 2]], columns=["a", "a"]))
+    multi = pd.DataFrame({"a": [1]}, index=pd.MultiIndex.from_tuples([(1, 2)]))
+    assert not SharedDatasetStore.is_storable(multi)
@@ -0,0 +1,32 @@
+# worker/tests/test_lttb.py
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("celery")
+pytest.importorskip("azuraforge_learner")
+
+from azuraforge_worker.callbacks import lttb_indices
+
+
+def test_returns_all_indices_when_threshold_does_not_reduce():
+    y = np.arange(10, dtype=float)
+    assert lttb_indices(y, 10).tolist() == list(range(10))
+    assert lttb_indices(y, 50).tolist() == list(range(10))
+    assert lttb_indices(y, 2).tolist() == list(range(10))
+
+
+def test_keeps_endpoints_and_returns_sorted_unique_indices():
+    rng = np.random.default_rng(0)
+    y = rng.normal(size=1000)
+    indices = lttb_indices(y, 100)
+
+    assert len(indices) == 100
+    assert indices[0] == 0 and indices[-1] == 999
+    assert (np.diff(indices) > 0).all()
+
+
+def test_keeps_spikes():
+    y = np.zeros(500)
+    y[137], y[402] = 50.0, -50.0
+    indices = lttb_indices(y, 20)
+    assert 137 in indices and 402 in indices
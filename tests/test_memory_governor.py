@@ -0,0 +1,45 @@
+# worker/tests/test_memory_governor.py
+import mmap
+import sys
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("pandas")
+pytest.importorskip("celery")
+
+from azuraforge_worker.memory_governor import MemoryGovernor, current_private_bytes
+
+_MB = 1024 ** 2
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="/proc is only available on Linux")
+def test_mapped_file_pages_are_not_private_memory(tmp_path):
+    path = tmp_path / "dataset.bin"
+    path.write_bytes(b"\1" * (64 * _MB))
+    before = current_private_bytes()
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        # Tüm sayfalara dokunulur; RSS artar ama özel bellek artmamalı.
+        assert sum(mapped[i] for i in range(0, len(mapped), mmap.PAGESIZE)) > 0
+        assert current_private_bytes() - before < 16 * _MB
+
+
+def test_sheds_in_order_until_below_soft_limit(monkeypatch):
+    readings = iter([300 * _MB, 150 * _MB])
+    monkeypatch.setattr("azuraforge_worker.memory_governor.current_private_bytes", lambda: next(readings))
+    governor = MemoryGovernor(soft_limit_bytes=200 * _MB, hard_limit_bytes=0)
+    calls = []
+    governor.register_shedder("first", lambda: calls.append("first"))
+    governor.register_shedder("second", lambda: calls.append("second"))
+
+    assert governor.check("task") == 150 * _MB
+    assert calls == ["first"]
+    assert governor.stats()["shed_freed_bytes"] == 150 * _MB
+
+
+def test_hard_limit_outside_prefork_is_reported_as_unenforced(monkeypatch):
+    monkeypatch.setattr("azuraforge_worker.memory_governor.current_private_bytes", lambda: 300 * _MB)
+    governor = MemoryGovernor(soft_limit_bytes=0, hard_limit_bytes=200 * _MB)
+    governor.check("task")
+    assert governor.over_hard_limit_unenforced == 1
+    assert governor.hard_limit_recycles == 0
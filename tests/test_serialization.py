@@ -0,0 +1,55 @@
+# worker/tests/test_serialization.py
+import base64
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+pytest.importorskip("celery")
+
+from azuraforge_worker.serialization import (RESPONSE_FORMAT_COLUMNAR, RESPONSE_FORMAT_COLUMNAR_B64,
+                                             RESPONSE_FORMAT_DICT, encode_series, epoch_ms,
+                                             normalize_response_format)
+
+
+@pytest.fixture
+def series():
+    index = pd.date_range("2024-01-01", periods=3, freq="h")
+    return pd.Series([1.5, 2.25, -3.0], index=index)
+
+
+def test_dict_format_is_backward_compatible(series):
+    assert encode_series(series, RESPONSE_FORMAT_DICT) == {
+        "2024-01-01T00:00:00": 1.5,
+        "2024-01-01T01:00:00": 2.25,
+        "2024-01-01T02:00:00": -3.0,
+    }
+
+
+def test_columnar_format(series):
+    encoded = encode_series(series, RESPONSE_FORMAT_COLUMNAR)
+    start_ms = int(pd.Timestamp("2024-01-01").value // 10**6)
+    assert encoded == {
+        "timestamps_ms": [start_ms, start_ms + 3_600_000, start_ms + 7_200_000],
+        "values": [1.5, 2.25, -3.0],
+    }
+
+
+def test_columnar_b64_format_decodes_to_float32(series):
+    encoded = encode_series(series, RESPONSE_FORMAT_COLUMNAR_B64)
+    values = np.frombuffer(base64.b64decode(encoded["values_b64"]), dtype="<f4")
+    assert encoded["dtype"] == "float32"
+    assert values.tolist() == [1.5, 2.25, -3.0]
+    assert encoded["timestamps_ms"] == encode_series(series, RESPONSE_FORMAT_COLUMNAR)["timestamps_ms"]
+
+
+def test_epoch_ms_uses_utc_for_tz_aware_index():
+    index = pd.date_range("2024-01-01 03:00", periods=2, freq="h", tz="Europe/Istanbul")
+    assert epoch_ms(index).tolist() == epoch_ms(index.tz_convert("UTC").tz_localize(None)).tolist()
+
+
+def test_normalize_response_format():
+    assert normalize_response_format(None) == RESPONSE_FORMAT_DICT
+    assert normalize_response_format("COLUMNAR") == RESPONSE_FORMAT_COLUMNAR
+    with pytest.raises(ValueError):
+        normalize_response_format("xml")